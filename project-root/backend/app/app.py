@@ -2,7 +2,7 @@ from flask import Flask, Blueprint, request, jsonify
 from flask_cors import CORS
 from flask_session import Session
 from .factory import create_app, db
-from .routes.recommendations import recommendations_bp
+from .routes.recommendations import recommendations_bp, servicio
 from .routes.auth import auth_bp
 
 
@@ -27,6 +27,9 @@ Session(app)
 with app.app_context():
     db.create_all()
 
+# Cargar el modelo y el catálogo antes de recibir tráfico
+servicio.calentar()
+
 @app.after_request
 def add_cors_headers(response):
     if 'Origin' in request.headers:
@@ -45,6 +48,13 @@ def handle_options(user_id):
     response.headers['Access-Control-Allow-Credentials'] = 'true'
     return response
 
+@app.route('/health', methods=['GET'])
+def health():
+    # Si el calentamiento falló se reintenta en segundo plano, con espera creciente entre intentos
+    servicio.reintentar_calentamiento()
+    estado = servicio.estado()
+    return jsonify(estado), 200 if estado['listo'] else 503
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
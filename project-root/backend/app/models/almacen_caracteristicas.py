@@ -0,0 +1,164 @@
+import hashlib
+import os
+from typing import Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .caracteristicas import COLUMNAS_NUMERICAS, INGREDIENTES_COMUNES, ConstructorCaracteristicas
+from .parseo_listas import CAMPOS_NUTRICION
+
+# Versión del formato del almacén; cambiarla invalida los almacenes existentes
+VERSION_ALMACEN = 2
+
+# Columnas que identifican el contenido de una receta
+COLUMNAS_HASH = ('name', 'minutes', 'n_steps', 'n_ingredients', 'ingredients', 'steps', 'tags', 'nutrition')
+
+# Columnas de metadatos que devuelve prepare_features
+COLUMNAS_METADATOS = ['name', 'steps', 'tags', 'ingredients']
+
+
+def hash_filas(data: pd.DataFrame) -> np.ndarray:
+    """
+    Hash de 64 bits del contenido de cada receta
+
+    Los números se comparan como float (el CSV y la base de datos no usan
+    los mismos tipos) y las listas por su repr, que es el mismo literal que
+    trae el CSV.
+    """
+    normalizado = pd.DataFrame({
+        columna: (data[columna].astype(float) if columna in ('minutes', 'n_steps', 'n_ingredients')
+                  else data[columna].map(str))
+        for columna in COLUMNAS_HASH
+    })
+    return pd.util.hash_pandas_object(normalizado, index=False).to_numpy()
+
+
+def firma_configuracion() -> str:
+    """
+    Hash de la configuración del constructor de características
+
+    Cubre las columnas numéricas, los ingredientes comunes, los campos de
+    nutrición y las columnas del hash de contenido. Si cambia alguno de ellos
+    las matrices guardadas ya no corresponden al código actual.
+    """
+    configuracion = (VERSION_ALMACEN, COLUMNAS_NUMERICAS, INGREDIENTES_COMUNES, CAMPOS_NUTRICION, COLUMNAS_HASH)
+    return hashlib.sha256(repr(configuracion).encode('utf-8')).hexdigest()
+
+
+class AlmacenCaracteristicas:
+    """
+    Almacén en disco de la salida de prepare_features
+
+    Guarda en un archivo joblib la matriz de características, los minutos,
+    el constructor ajustado (con sus vocabularios) y el hash de contenido de
+    cada receta; los metadatos van en un archivo aparte para no leerlos en
+    cada ejecución. En la siguiente ejecución las recetas cuyo hash ya está
+    guardado reutilizan su fila y solo se construyen las características de
+    las nuevas, que se añaden al almacén sin quitar las guardadas (una
+    ejecución con un subconjunto no reemplaza el almacén completo). Las
+    etiquetas que aparecen por primera vez se añaden como columnas al final,
+    con ceros en las filas guardadas, así que la matriz coincide con la que
+    se obtendría con el vocabulario ampliado. Un almacén guardado con otra
+    configuración del constructor (ver firma_configuracion) se descarta.
+
+    Args:
+        ruta (str): Archivo del almacén
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.ruta_metadatos = f"{ruta}.metadatos"
+        self.constructor: Optional[ConstructorCaracteristicas] = None
+
+    def cargar(self, metadatos: bool = False) -> Optional[dict]:
+        """
+        Contenido guardado o None si no existe o es de otra configuración
+
+        Args:
+            metadatos (bool): Leer también los metadatos de las recetas
+
+        Returns:
+            Diccionario con hashes, X, y y constructor (y metadatos si se piden)
+        """
+        if not os.path.exists(self.ruta):
+            return None
+        guardado = joblib.load(self.ruta)
+        if guardado.get('configuracion') != firma_configuracion():
+            print("Almacén de características de otra configuración del constructor; se reconstruye")
+            return None
+        if metadatos:
+            guardado['metadatos'] = joblib.load(self.ruta_metadatos)
+        self.constructor = guardado['constructor']
+        return guardado
+
+    def _guardar(self, hashes: np.ndarray, X: sparse.csr_matrix, y: pd.Series, metadatos: pd.DataFrame):
+        # Una fila por contenido distinto; cada archivo se escribe a un temporal y se renombra
+        unicas = ~pd.Index(hashes).duplicated()
+        joblib.dump(metadatos[unicas].reset_index(drop=True), f"{self.ruta_metadatos}.tmp")
+        joblib.dump({
+            'hashes': hashes[unicas],
+            'X': X[unicas],
+            'y': y[unicas].reset_index(drop=True),
+            'constructor': self.constructor,
+            'configuracion': firma_configuracion()
+        }, f"{self.ruta}.tmp")
+        os.replace(f"{self.ruta_metadatos}.tmp", self.ruta_metadatos)
+        os.replace(f"{self.ruta}.tmp", self.ruta)
+
+    def preparar(self, data: pd.DataFrame) -> Tuple[sparse.csr_matrix, pd.Series, pd.DataFrame]:
+        """
+        Características de las recetas reutilizando las ya guardadas
+
+        Args:
+            data (pd.DataFrame): Recetas del CSV o de fetch_data
+
+        Returns:
+            Tupla (matriz CSR de características, minutos, metadatos), en el orden de data
+        """
+        hashes = hash_filas(data)
+        guardado = self.cargar()
+        y = data['minutes']
+        metadatos = data[COLUMNAS_METADATOS]
+
+        if guardado is None:
+            self.constructor = ConstructorCaracteristicas()
+            X = self.constructor.ajustar_transformar(data)
+            reutilizadas = 0
+            nuevas = np.ones(len(data), dtype=bool)
+            self._guardar(hashes, X, y, metadatos)
+        else:
+            posiciones = pd.Index(guardado['hashes']).get_indexer(hashes)
+            nuevas = posiciones < 0
+            reutilizadas = int((~nuevas).sum())
+
+            X_guardada = guardado['X']
+            if nuevas.any():
+                datos_nuevos = data[nuevas]
+                anadidas = self.constructor.ampliar(datos_nuevos)
+                if anadidas:
+                    X_guardada = sparse.hstack(
+                        [X_guardada, sparse.csr_matrix((X_guardada.shape[0], anadidas))], format='csr'
+                    )
+                X_nuevas = self.constructor.transformar(datos_nuevos)
+            else:
+                X_nuevas = sparse.csr_matrix((0, X_guardada.shape[1]))
+
+            # Filas reutilizadas y nuevas apiladas y devueltas al orden de data
+            apilada = sparse.vstack([X_guardada[posiciones[~nuevas]], X_nuevas], format='csr')
+            orden = np.concatenate([np.flatnonzero(~nuevas), np.flatnonzero(nuevas)])
+            X = apilada[np.argsort(orden)]
+
+            # Las recetas nuevas se añaden a las guardadas
+            if nuevas.any():
+                self._guardar(
+                    np.concatenate([guardado['hashes'], hashes[nuevas]]),
+                    sparse.vstack([X_guardada, X_nuevas], format='csr'),
+                    pd.concat([guardado['y'], y[nuevas]], ignore_index=True),
+                    pd.concat([joblib.load(self.ruta_metadatos), metadatos[nuevas]], ignore_index=True)
+                )
+
+        print(f"Almacén de características: {reutilizadas} recetas reutilizadas, {int(nuevas.sum())} calculadas")
+        return X, y, metadatos
@@ -0,0 +1,158 @@
+from itertools import chain
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .parseo_listas import CAMPOS_NUTRICION, parsear_columna
+
+# Ingredientes que se codifican como indicadores (se comparan en minúsculas)
+INGREDIENTES_COMUNES = (
+    'flour', 'sugar', 'salt', 'butter', 'milk', 'egg', 'water',
+    'olive oil', 'garlic', 'onion', 'pepper', 'chicken', 'vanilla'
+)
+
+# Columnas numéricas por receta, antes de ingredientes, nutrición y etiquetas
+COLUMNAS_NUMERICAS = ('n_steps', 'n_ingredients', 'steps_complexity', 'ingredient_density')
+
+
+def _codificar_listas(listas: Sequence[list], vocabulario: pd.Index, minusculas: bool = False) -> sparse.csr_matrix:
+    """
+    Matriz binaria receta × vocabulario a partir de listas de tokens
+
+    Todos los tokens se aplanan en un solo arreglo y se buscan en el
+    vocabulario con una única llamada a get_indexer; los que no están en él
+    se ignoran y los repetidos en una misma receta cuentan una vez.
+    """
+    longitudes = np.fromiter((len(lista) for lista in listas), dtype=np.int64, count=len(listas))
+    tokens = pd.Series(list(chain.from_iterable(listas)), dtype=object)
+    if minusculas:
+        tokens = tokens.astype(str).str.lower()
+    columnas = vocabulario.get_indexer(tokens)
+    filas = np.repeat(np.arange(len(listas)), longitudes)
+    validos = columnas >= 0
+
+    matriz = sparse.csr_matrix(
+        (np.ones(int(validos.sum())), (filas[validos], columnas[validos])),
+        shape=(len(listas), len(vocabulario))
+    )
+    matriz.data[:] = 1.0
+    return matriz
+
+
+class ConstructorCaracteristicas:
+    """
+    Construcción de la matriz de características del modelo de tiempos
+
+    Produce las mismas columnas que prepare_features (numéricas, indicadores
+    de ingredientes comunes, nutrición y una columna por etiqueta) pero
+    directamente como matriz dispersa CSR: la memoria crece con los valores
+    distintos de cero y no con recetas × etiquetas. El vocabulario de
+    etiquetas se fija en ajustar(), así que las características de inferencia
+    tienen exactamente las columnas del entrenamiento; las etiquetas nuevas se
+    ignoran.
+
+    Args:
+        ingredientes (list): Ingredientes codificados como indicadores
+    """
+
+    def __init__(self, ingredientes: Sequence[str] = INGREDIENTES_COMUNES):
+        self.ingredientes = pd.Index(list(ingredientes))
+        self.etiquetas: Optional[pd.Index] = None
+
+    @property
+    def ajustado(self) -> bool:
+        return self.etiquetas is not None
+
+    @property
+    def nombres_columnas(self) -> List[str]:
+        if not self.ajustado:
+            raise ValueError("El constructor de características no está ajustado. Llame primero a ajustar().")
+        return list(COLUMNAS_NUMERICAS) + list(self.ingredientes) + list(CAMPOS_NUTRICION) + list(self.etiquetas)
+
+    @staticmethod
+    def _listas(data: pd.DataFrame, columna: str, default: list) -> pd.Series:
+        listas, fallos = parsear_columna(data[columna], default)
+        if fallos:
+            print(f"Celdas de '{columna}' que no se pudieron parsear: {fallos}")
+        return listas
+
+    def ajustar(self, data: pd.DataFrame) -> 'ConstructorCaracteristicas':
+        """Fijar el vocabulario de etiquetas (ordenado, como MultiLabelBinarizer)"""
+        etiquetas = self._listas(data, 'tags', [])
+        self.etiquetas = pd.Index(sorted(set(chain.from_iterable(etiquetas)), key=str))
+        return self
+
+    def ajustar_vocabulario(self, etiquetas: Iterable[str]) -> 'ConstructorCaracteristicas':
+        """Fijar el vocabulario de etiquetas a partir de una lista, por ejemplo la tabla tags"""
+        self.etiquetas = pd.Index(sorted(set(etiquetas), key=str))
+        return self
+
+    def ampliar(self, data: pd.DataFrame) -> int:
+        """
+        Añadir al final del vocabulario las etiquetas que aún no tiene
+
+        Las columnas existentes no cambian de posición, así que una matriz ya
+        construida sigue siendo válida añadiéndole columnas de ceros.
+
+        Returns:
+            Número de etiquetas añadidas
+        """
+        if not self.ajustado:
+            self.ajustar(data)
+            return len(self.etiquetas)
+        etiquetas = self._listas(data, 'tags', [])
+        nuevas = sorted(set(chain.from_iterable(etiquetas)).difference(self.etiquetas), key=str)
+        if nuevas:
+            self.etiquetas = self.etiquetas.append(pd.Index(nuevas))
+        return len(nuevas)
+
+    def transformar(self, data: pd.DataFrame) -> sparse.csr_matrix:
+        """
+        Matriz de características de las recetas
+
+        Args:
+            data (pd.DataFrame): Recetas con n_steps, n_ingredients y las columnas
+                ingredients, nutrition y tags como listas o literales de listas
+
+        Returns:
+            Matriz CSR de forma (recetas, len(nombres_columnas))
+        """
+        if not self.ajustado:
+            raise ValueError("El constructor de características no está ajustado. Llame primero a ajustar().")
+
+        n_steps = data['n_steps'].to_numpy(dtype=float)
+        n_ingredients = data['n_ingredients'].to_numpy(dtype=float)
+        numericas = np.column_stack([
+            n_steps,
+            n_ingredients,
+            n_steps * n_ingredients,
+            n_ingredients / np.where(n_steps == 0, 1, n_steps)
+        ])
+
+        ancho = len(CAMPOS_NUTRICION)
+        nutricion = np.array(
+            [list(valores[:ancho]) + [0.0] * (ancho - len(valores[:ancho]))
+             for valores in self._listas(data, 'nutrition', [0.0] * ancho)],
+            dtype=float
+        ).reshape(len(data), ancho)
+
+        ingredientes = _codificar_listas(self._listas(data, 'ingredients', []), self.ingredientes, minusculas=True)
+        etiquetas = _codificar_listas(self._listas(data, 'tags', []), self.etiquetas)
+
+        densas = np.nan_to_num(np.hstack([numericas, nutricion]))
+        return sparse.hstack([
+            sparse.csr_matrix(densas[:, :len(COLUMNAS_NUMERICAS)]),
+            ingredientes,
+            sparse.csr_matrix(densas[:, len(COLUMNAS_NUMERICAS):]),
+            etiquetas
+        ], format='csr')
+
+    def ajustar_transformar(self, data: pd.DataFrame) -> sparse.csr_matrix:
+        # Las columnas se parsean una vez; ajustar y transformar reciben ya las listas
+        data = data.assign(**{
+            columna: self._listas(data, columna, default)
+            for columna, default in (('ingredients', []), ('tags', []), ('nutrition', [0.0] * len(CAMPOS_NUTRICION)))
+        })
+        return self.ajustar(data).transformar(data)
@@ -0,0 +1,118 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MaxAbsScaler
+from sklearn.svm import SVR
+
+from .caracteristicas import ConstructorCaracteristicas
+from .ingesta import limpiar_recetas
+from .motor_kernel import MotorKernelAproximado
+
+# Filas de entrenamiento máximas para el SVR exacto
+FILAS_SVR = 5000
+
+# Predicciones de una sola receta usadas para medir la latencia individual
+MUESTRAS_LATENCIA = 200
+
+
+class _SVRExacto:
+    """SVR exacto con los parámetros de ImprovedRecipeRecommender y la misma interfaz que los motores"""
+
+    def __init__(self):
+        self.model = Pipeline([
+            ('scaler', MaxAbsScaler()),
+            ('svm', SVR(kernel='rbf', C=10, gamma='scale', epsilon=0.1))
+        ])
+
+    def train_model(self, X_train, y_train):
+        inicio = time.time()
+        self.model.fit(X_train, y_train)
+        return self.model.named_steps['svm'].get_params(), time.time() - inicio
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+def medir(nombre: str, motor, X_train, y_train, X_test, y_test) -> dict:
+    """Entrenar un motor y medir precisión, tiempo de entrenamiento y latencia de predicción"""
+    _, segundos_entrenamiento = motor.train_model(X_train, y_train)
+
+    inicio = time.perf_counter()
+    y_pred = motor.predict(X_test)
+    segundos_lote = time.perf_counter() - inicio
+
+    latencias = []
+    for fila in range(min(MUESTRAS_LATENCIA, X_test.shape[0])):
+        inicio = time.perf_counter()
+        motor.predict(X_test[fila:fila + 1])
+        latencias.append(time.perf_counter() - inicio)
+
+    errores = np.abs(np.asarray(y_test) - y_pred)
+    return {
+        'motor': nombre,
+        'filas_entrenamiento': X_train.shape[0],
+        'segundos_entrenamiento': segundos_entrenamiento,
+        'r2': 1 - np.sum(errores ** 2) / np.sum((np.asarray(y_test) - np.mean(y_test)) ** 2),
+        'mae': float(errores.mean()),
+        'us_por_receta_lote': segundos_lote / X_test.shape[0] * 1e6,
+        'ms_una_receta_p50': float(np.median(latencias) * 1000)
+    }
+
+
+def comparar_motores(csv_path: str, filas: int = None, filas_svr: int = FILAS_SVR) -> pd.DataFrame:
+    """
+    Comparar el SVR exacto con MotorKernelAproximado sobre el mismo conjunto de prueba
+
+    El SVR exacto y el motor aproximado se entrenan con las mismas filas_svr
+    recetas para comparar la precisión de la aproximación, y el motor
+    aproximado además con todo el conjunto de entrenamiento.
+
+    Args:
+        csv_path (str): CSV de recetas (RAW_recipes.csv)
+        filas (int): Recetas a leer del CSV; None para todas
+        filas_svr (int): Filas de entrenamiento del SVR exacto
+
+    Returns:
+        DataFrame con una fila por motor
+    """
+    data = limpiar_recetas(pd.read_csv(csv_path, nrows=filas))
+    X = ConstructorCaracteristicas().ajustar_transformar(data)
+    y = data['minutes']
+
+    # Mismo filtro de valores atípicos que main()
+    q1, q3 = np.percentile(y, [25, 75])
+    validas = ((y >= q1 - 1.5 * (q3 - q1)) & (y <= q3 + 1.5 * (q3 - q1))).to_numpy()
+    X, y = X[validas], y[validas].to_numpy(dtype=float)
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    n_svr = min(filas_svr, X_train.shape[0])
+    print(f"Recetas: {X.shape[0]} ({X_train.shape[0]} entrenamiento, {X_test.shape[0]} prueba), {X.shape[1]} columnas")
+
+    resultados = [
+        medir('svr_exacto', _SVRExacto(), X_train[:n_svr], y_train[:n_svr], X_test, y_test),
+        medir('kernel_aproximado', MotorKernelAproximado(), X_train[:n_svr], y_train[:n_svr], X_test, y_test)
+    ]
+    if X_train.shape[0] > n_svr:
+        resultados.append(medir('kernel_aproximado', MotorKernelAproximado(), X_train, y_train, X_test, y_test))
+    return pd.DataFrame(resultados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar el SVR exacto con el motor de kernel aproximado")
+    parser.add_argument('csv', help="CSV de recetas (RAW_recipes.csv)")
+    parser.add_argument('--filas', type=int, default=None, help="Recetas a leer del CSV (por defecto todas)")
+    parser.add_argument('--filas-svr', type=int, default=FILAS_SVR, help="Filas de entrenamiento del SVR exacto")
+    args = parser.parse_args()
+
+    resultados = comparar_motores(args.csv, args.filas, args.filas_svr)
+    with pd.option_context('display.width', 200, 'display.float_format', '{:.4f}'.format):
+        print(resultados.to_string(index=False))
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.models.comparar_motores <RAW_recipes.csv> [--filas N] [--filas-svr N]
+    main()
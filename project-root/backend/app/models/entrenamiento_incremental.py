@@ -0,0 +1,286 @@
+import time
+from typing import Iterator, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import MaxAbsScaler, StandardScaler
+from sqlalchemy import MetaData
+from sqlalchemy.engine import Engine
+
+from .caracteristicas import ConstructorCaracteristicas
+from .lectura import TAMANO_LOTE_LECTURA, LecturaRecetas
+from .motor_kernel import MotorKernelAproximado, _bloques
+
+# Dimensión de la aproximación de Nystroem, ajustada con el primer lote de entrenamiento
+N_COMPONENTES_INCREMENTAL = 500
+
+# Pasadas del regresor sobre el catálogo en el entrenamiento completo
+EPOCAS = 3
+
+# Minutos guardados en la muestra de reservorio para estimar cuartiles, media y desviación
+MUESTRA_OBJETIVO = 100000
+
+# Una de cada MODULO_VALIDACION recetas (por id) no se entrena y se usa para evaluar
+MODULO_VALIDACION = 10
+
+
+class EntrenadorIncremental:
+    """
+    Entrenamiento fuera de memoria del modelo de tiempos
+
+    Las recetas se leen de la base de datos por lotes con LecturaRecetas
+    (cursores del lado del servidor) y ningún paso guarda el catálogo
+    completo, así que la memoria depende de tamano_lote y de
+    N_COMPONENTES_INCREMENTAL y no del número de recetas:
+
+    1. El vocabulario de etiquetas se fija con la tabla tags, antes de leer
+       ninguna receta, para que todos los lotes tengan las mismas columnas.
+    2. Una primera pasada acumula las estadísticas de MaxAbsScaler con
+       partial_fit y una muestra de reservorio de los minutos, de la que
+       salen los límites de valores atípicos (el mismo filtro IQR de main)
+       y la media y desviación usadas para escalar el objetivo.
+    3. Nystroem se ajusta con el primer lote y una segunda pasada acumula con
+       partial_fit la media y varianza de la proyección (StandardScaler): sin
+       estandarizarla el descenso por gradiente converge muy despacio.
+    4. SGDRegressor se actualiza con partial_fit lote a lote durante varias
+       épocas.
+
+    El id de la última receta leída se guarda con el modelo; incorporar_nuevas
+    lee solo las recetas con id mayor y actualiza el regresor sin volver a
+    entrenar. Los escaladores y Nystroem quedan fijos después del entrenamiento
+    completo porque cambiarlos invalidaría los coeficientes ya aprendidos, y
+    las etiquetas que no estaban en la tabla tags al entrenar se ignoran.
+
+    Args:
+        engine (Engine): Motor de SQLAlchemy de la base de datos
+        metadata (MetaData): Metadatos con las tablas del esquema normalizado
+        tamano_lote (int): Recetas por lote leído de la base de datos
+        n_componentes (int): Columnas de la aproximación de Nystroem
+        epocas (int): Pasadas sobre el catálogo en entrenar()
+        semilla (int): Semilla de la muestra, de Nystroem y del regresor
+    """
+
+    def __init__(self, engine: Engine, metadata: MetaData, tamano_lote: int = TAMANO_LOTE_LECTURA,
+                 n_componentes: int = N_COMPONENTES_INCREMENTAL, epocas: int = EPOCAS, semilla: int = 42):
+        self.lector = LecturaRecetas(engine, metadata, tamano_lote)
+        self.n_componentes = n_componentes
+        self.epocas = epocas
+        self.semilla = semilla
+        self.constructor: Optional[ConstructorCaracteristicas] = None
+        self.escalador: Optional[MaxAbsScaler] = None
+        self.nystroem: Optional[Nystroem] = None
+        self.escalador_proyeccion: Optional[StandardScaler] = None
+        self.regresor: Optional[SGDRegressor] = None
+        self.limites: Optional[Tuple[float, float]] = None
+        self.media_y = 0.0
+        self.escala_y = 1.0
+        self.ultimo_id: Optional[int] = None
+        self.recetas_entrenadas = 0
+        self.metricas: Optional[dict] = None
+
+    @property
+    def entrenado(self) -> bool:
+        return self.regresor is not None
+
+    def _lotes(self, limit: Optional[int] = None, desde_id: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        # Recetas sin minutos no sirven para entrenar ni evaluar
+        for lote in self.lector.lotes(limit, desde_id):
+            lote = lote[lote['minutes'].notna()]
+            if len(lote):
+                yield lote
+
+    def _filtrar(self, lote: pd.DataFrame, validacion: bool) -> pd.DataFrame:
+        """Filas dentro de los límites de minutos, de entrenamiento o de validación según su id"""
+        minutos = lote['minutes'].astype(float)
+        en_validacion = (lote['id'] % MODULO_VALIDACION == 0) == validacion
+        return lote[en_validacion & minutos.between(*self.limites)]
+
+    def _proyectar(self, X) -> np.ndarray:
+        return self.escalador_proyeccion.transform(self.nystroem.transform(self.escalador.transform(X)))
+
+    def _actualizar(self, lote: pd.DataFrame) -> int:
+        """Un paso de partial_fit con las filas de entrenamiento del lote"""
+        lote = self._filtrar(lote, validacion=False)
+        if len(lote):
+            y = (lote['minutes'].to_numpy(dtype=float) - self.media_y) / self.escala_y
+            self.regresor.partial_fit(self._proyectar(self.constructor.transformar(lote)), y)
+        return len(lote)
+
+    def _estadisticas(self, limit: Optional[int]):
+        """Primera pasada: estadísticas del escalador y muestra de reservorio de los minutos"""
+        rng = np.random.default_rng(self.semilla)
+        muestra = np.empty(MUESTRA_OBJETIVO)
+        vistos = 0
+        for lote in self._lotes(limit):
+            self.escalador.partial_fit(self.constructor.transformar(lote))
+            minutos = lote['minutes'].to_numpy(dtype=float)
+
+            # Reservorio (algoritmo R): la posición global t reemplaza un elemento con probabilidad K / (t + 1)
+            libres = max(0, min(MUESTRA_OBJETIVO - vistos, len(minutos)))
+            muestra[vistos:vistos + libres] = minutos[:libres]
+            posiciones = rng.integers(0, np.arange(vistos + libres, vistos + len(minutos)) + 1)
+            reemplazos = posiciones < MUESTRA_OBJETIVO
+            muestra[posiciones[reemplazos]] = minutos[libres:][reemplazos]
+
+            vistos += len(minutos)
+            self.ultimo_id = int(lote['id'].iloc[-1])
+
+        if vistos == 0:
+            raise ValueError("No hay recetas con minutos en la base de datos.")
+        muestra = muestra[:min(vistos, MUESTRA_OBJETIVO)]
+        q1, q3 = np.percentile(muestra, [25, 75])
+        self.limites = (q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+        validos = muestra[(muestra >= self.limites[0]) & (muestra <= self.limites[1])]
+        self.media_y = float(validos.mean())
+        self.escala_y = float(validos.std()) or 1.0
+
+    def _ajustar_proyeccion(self, limit: Optional[int]):
+        """Segunda pasada: Nystroem con el primer lote y estadísticas de la proyección"""
+        self.nystroem = None
+        self.escalador_proyeccion = StandardScaler()
+        for lote in self._lotes(limit):
+            X = self.escalador.transform(self.constructor.transformar(self._filtrar(lote, validacion=False)))
+            if X.shape[0] == 0:
+                continue
+            if self.nystroem is None:
+                # Con el gamma='scale' de SVR, como el modelo original
+                self.nystroem = Nystroem(
+                    kernel='rbf', gamma=MotorKernelAproximado._gamma_escala(X),
+                    n_components=min(self.n_componentes, X.shape[0]), random_state=self.semilla
+                ).fit(X)
+            self.escalador_proyeccion.partial_fit(self.nystroem.transform(X))
+
+    def entrenar(self, limit: Optional[int] = None) -> Tuple[dict, float]:
+        """
+        Entrenamiento completo recorriendo la base de datos por lotes
+
+        Args:
+            limit (int): Máximo de recetas, en orden de id; None para todo el catálogo
+
+        Returns:
+            Tupla (parámetros del modelo, segundos de entrenamiento)
+        """
+        inicio = time.time()
+        self.constructor = ConstructorCaracteristicas().ajustar_vocabulario(self.lector.etiquetas())
+        self.escalador = MaxAbsScaler()
+        self._estadisticas(limit)
+        self._ajustar_proyeccion(limit)
+
+        self.regresor = SGDRegressor(penalty='l2', alpha=1e-5, average=True, random_state=self.semilla)
+        for _ in range(self.epocas):
+            filas = 0
+            for lote in self._lotes(limit):
+                filas += self._actualizar(lote)
+            self.recetas_entrenadas = filas
+
+        parametros = {
+            'gamma': self.nystroem.gamma,
+            'n_components': self.nystroem.n_components,
+            'epocas': self.epocas,
+            'alpha': self.regresor.alpha
+        }
+        return parametros, time.time() - inicio
+
+    def incorporar_nuevas(self) -> int:
+        """
+        Actualizar el modelo con las recetas añadidas desde el último entrenamiento
+
+        Solo se leen las recetas con id mayor que ultimo_id y el regresor se
+        actualiza con una pasada de partial_fit sobre ellas.
+
+        Returns:
+            Número de recetas nuevas usadas para entrenar
+        """
+        if not self.entrenado:
+            raise ValueError("El modelo no está entrenado. Llame primero a entrenar().")
+        filas = 0
+        for lote in self._lotes(desde_id=self.ultimo_id):
+            filas += self._actualizar(lote)
+            self.ultimo_id = int(lote['id'].iloc[-1])
+        self.recetas_entrenadas += filas
+        return filas
+
+    def predict(self, X) -> np.ndarray:
+        """Minutos predichos para una matriz de características de constructor.transformar"""
+        if not self.entrenado:
+            raise ValueError("El modelo no está entrenado. Llame primero a entrenar().")
+        predicciones = [self.regresor.predict(self._proyectar(X[bloque])) for bloque in _bloques(X.shape[0])]
+        return np.concatenate(predicciones or [np.empty(0)]) * self.escala_y + self.media_y
+
+    def evaluar(self, limit: Optional[int] = None, desde_id: Optional[int] = None) -> dict:
+        """
+        Métricas sobre las recetas de validación, acumuladas lote a lote
+
+        No incluye la mediana del error absoluto, que necesitaría guardar
+        todos los errores.
+
+        Args:
+            limit (int): Máximo de recetas, en orden de id; None para todo el catálogo
+            desde_id (int): Evaluar solo las recetas con id mayor, por ejemplo las
+                recién incorporadas; None para empezar por la primera
+        """
+        inicio = time.time()
+        filas, suma_y, suma_y2, suma_error2, suma_error = 0, 0.0, 0.0, 0.0, 0.0
+        for lote in self._lotes(limit, desde_id):
+            lote = self._filtrar(lote, validacion=True)
+            if not len(lote):
+                continue
+            y = lote['minutes'].to_numpy(dtype=float)
+            errores = y - self.predict(self.constructor.transformar(lote))
+            filas += len(y)
+            suma_y += y.sum()
+            suma_y2 += (y ** 2).sum()
+            suma_error2 += (errores ** 2).sum()
+            suma_error += np.abs(errores).sum()
+
+        if filas == 0:
+            raise ValueError("No hay recetas de validación dentro de los límites de minutos.")
+        mse = suma_error2 / filas
+        return {
+            'r2_score': 1 - suma_error2 / (suma_y2 - suma_y ** 2 / filas),
+            'mse': mse,
+            'rmse': np.sqrt(mse),
+            'mae': suma_error / filas,
+            'filas_validacion': filas,
+            'prediction_time': time.time() - inicio
+        }
+
+    def save_model(self, path: str, **extra):
+        """Guardar el estado del modelo; cargar() lo restaura para seguir incorporando recetas"""
+        if not self.entrenado:
+            raise ValueError("El modelo no está entrenado. Llame primero a entrenar().")
+        joblib.dump({
+            'feature_builder': self.constructor,
+            'scaler': self.escalador,
+            'nystroem': self.nystroem,
+            'projection_scaler': self.escalador_proyeccion,
+            'regressor': self.regresor,
+            'limites': self.limites,
+            'media_y': self.media_y,
+            'escala_y': self.escala_y,
+            'ultimo_id': self.ultimo_id,
+            'recetas_entrenadas': self.recetas_entrenadas,
+            'search_mode': 'incremental',
+            **extra
+        }, path)
+
+    @classmethod
+    def cargar(cls, path: str, engine: Engine, metadata: MetaData, **kwargs) -> 'EntrenadorIncremental':
+        """Restaurar un modelo guardado con save_model"""
+        guardado = joblib.load(path)
+        entrenador = cls(engine, metadata, **kwargs)
+        entrenador.constructor = guardado['feature_builder']
+        entrenador.escalador = guardado['scaler']
+        entrenador.nystroem = guardado['nystroem']
+        entrenador.escalador_proyeccion = guardado['projection_scaler']
+        entrenador.regresor = guardado['regressor']
+        entrenador.limites = guardado['limites']
+        entrenador.media_y = guardado['media_y']
+        entrenador.escala_y = guardado['escala_y']
+        entrenador.ultimo_id = guardado['ultimo_id']
+        entrenador.recetas_entrenadas = guardado['recetas_entrenadas']
+        entrenador.metricas = guardado.get('metrics')
+        return entrenador
@@ -0,0 +1,176 @@
+import json
+import sys
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.svm import SVC
+
+from ..utils.motor_inferencia import MotorSVC, VERSION_ARTEFACTO
+
+
+def compilar_pipeline(pipeline) -> dict:
+    """
+    Compilar el pipeline entrenado (ColumnTransformer + SVC) en arreglos NumPy
+
+    Args:
+        pipeline: Pipeline de scikit-learn con pasos 'preprocessor' y 'classifier'
+
+    Returns:
+        Diccionario de arreglos listo para guardarse con np.savez
+    """
+    preprocesador = pipeline.steps[0][1]
+    clasificador = pipeline.steps[-1][1]
+
+    if not isinstance(preprocesador, ColumnTransformer):
+        raise ValueError("El primer paso del pipeline debe ser un ColumnTransformer")
+    if not isinstance(clasificador, SVC) or clasificador.kernel != 'rbf':
+        raise ValueError("El último paso del pipeline debe ser un SVC con kernel RBF")
+
+    columnas_numericas = []
+    media = escala = None
+    inicio_numericas = 0
+    categorias = {}
+    columna_actual = 0
+
+    # Recorrer los transformadores en el mismo orden en que generan columnas
+    for nombre, transformador, columnas in preprocesador.transformers_:
+        if nombre == 'remainder':
+            if transformador != 'drop':
+                raise ValueError("Solo se soporta remainder='drop'")
+            continue
+
+        if isinstance(transformador, StandardScaler):
+            if columnas_numericas:
+                raise ValueError("Solo se soporta un StandardScaler en el preprocesador")
+            columnas_numericas = list(columnas)
+            inicio_numericas = columna_actual
+            media = transformador.mean_ if transformador.with_mean else np.zeros(len(columnas))
+            escala = transformador.scale_ if transformador.with_std else np.ones(len(columnas))
+            columna_actual += len(columnas)
+
+        elif isinstance(transformador, OneHotEncoder):
+            if transformador.handle_unknown != 'ignore':
+                raise ValueError("El OneHotEncoder debe usar handle_unknown='ignore'")
+            indices_drop = transformador.drop_idx_
+            for k, (columna, valores) in enumerate(zip(columnas, transformador.categories_)):
+                drop = None if indices_drop is None else indices_drop[k]
+                posiciones = {}
+                for idx, valor in enumerate(valores):
+                    if drop is not None and idx == drop:
+                        continue
+                    posiciones[str(valor)] = columna_actual
+                    columna_actual += 1
+                categorias[columna] = posiciones
+
+        else:
+            raise ValueError(f"Transformador no soportado: {type(transformador).__name__}")
+
+    metadatos = {
+        'version': VERSION_ARTEFACTO,
+        'columnas_numericas': columnas_numericas,
+        'inicio_numericas': inicio_numericas,
+        'categorias': categorias,
+        'n_columnas': columna_actual
+    }
+
+    return {
+        'metadatos': np.array(json.dumps(metadatos, ensure_ascii=False)),
+        'media': np.asarray(media, dtype=np.float64),
+        'escala': np.asarray(escala, dtype=np.float64),
+        'vectores_soporte': np.asarray(clasificador.support_vectors_, dtype=np.float64),
+        'coef_dual': np.asarray(clasificador.dual_coef_, dtype=np.float64),
+        'intercepto': np.asarray(clasificador.intercept_, dtype=np.float64),
+        'n_soporte': np.asarray(clasificador.n_support_, dtype=np.int64),
+        'clases': np.asarray(clasificador.classes_),
+        'gamma': np.array(clasificador._gamma, dtype=np.float64)
+    }
+
+
+def generar_perfiles(motor: MotorSVC, n_muestras: int = 2000, semilla: int = 42) -> list:
+    """
+    Generar perfiles aleatorios que cubren el dominio de entrada del modelo
+
+    Incluye todas las categorías conocidas y un valor desconocido por columna
+    para comprobar también el caso handle_unknown='ignore'.
+    """
+    rng = np.random.default_rng(semilla)
+    rangos = {'Edad': (1, 120), 'Peso (kg)': (1, 300), 'Altura (cm)': (1, 250)}
+
+    perfiles = []
+    for _ in range(n_muestras):
+        perfil = {}
+        for columna in motor.columnas_numericas:
+            minimo, maximo = rangos.get(columna, (0, 1000))
+            perfil[columna] = float(rng.uniform(minimo, maximo))
+        for columna, posiciones in motor.categorias.items():
+            valores = list(posiciones) + ['__desconocido__']
+            perfil[columna] = valores[rng.integers(len(valores))]
+        perfiles.append(perfil)
+    return perfiles
+
+
+def verificar_equivalencia(pipeline, motor: MotorSVC, n_muestras: int = 2000, tolerancia: float = 1e-6) -> dict:
+    """
+    Comparar el motor compilado con el pipeline de scikit-learn
+
+    Args:
+        pipeline: Pipeline original
+        motor (MotorSVC): Motor compilado a partir del pipeline
+        n_muestras (int): Número de perfiles aleatorios a evaluar
+        tolerancia (float): Diferencia máxima permitida en la función de decisión
+
+    Returns:
+        Diccionario con el número de perfiles, coincidencias y la diferencia máxima
+
+    Raises:
+        ValueError: Si alguna etiqueta o valor de decisión no coincide
+    """
+    perfiles = generar_perfiles(motor, n_muestras)
+    X = pd.DataFrame(perfiles)
+
+    etiquetas_sklearn = pipeline.predict(X)
+    etiquetas_motor = motor.predict(perfiles)
+
+    decision_sklearn = pipeline.decision_function(X)
+    clasificador = pipeline.steps[-1][1]
+    if len(motor.classes_) > 2 and clasificador.decision_function_shape == 'ovr':
+        # La forma 'ovr' agrega los pares; se compara directamente la forma 'ovo'
+        decision_sklearn = clasificador._decision_function(pipeline[:-1].transform(X))
+    decision_motor = motor.decision(motor.transformar(perfiles))
+
+    diferencia = float(np.max(np.abs(decision_sklearn - decision_motor)))
+    coincidencias = int(np.sum(etiquetas_sklearn == etiquetas_motor))
+
+    if coincidencias != len(perfiles):
+        raise ValueError(f"El motor compilado no es equivalente: {len(perfiles) - coincidencias} etiquetas no coinciden")
+    if not diferencia <= tolerancia:
+        raise ValueError(f"El motor compilado no es equivalente: diferencia máxima en la decisión {diferencia}")
+
+    return {'perfiles': len(perfiles), 'coincidencias': coincidencias, 'diferencia_maxima': diferencia}
+
+
+def exportar_modelo(ruta_modelo: str, ruta_salida: str, n_muestras: int = 2000) -> dict:
+    """
+    Compilar el modelo guardado con joblib y guardarlo como artefacto .npz
+
+    El artefacto solo se escribe si el motor compilado es equivalente al
+    pipeline original.
+    """
+    pipeline = joblib.load(ruta_modelo)
+    artefacto = compilar_pipeline(pipeline)
+
+    motor = MotorSVC(artefacto)
+    resultado = verificar_equivalencia(pipeline, motor, n_muestras)
+
+    np.savez(ruta_salida, **artefacto)
+    print(f"Modelo compilado guardado en {ruta_salida}")
+    print(f"- Vectores de soporte: {motor.vectores_soporte.shape[0]}")
+    print(f"- Perfiles verificados: {resultado['perfiles']} (diferencia máxima {resultado['diferencia_maxima']:.2e})")
+    return resultado
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.models.exportar_modelo <modelo.joblib> <salida.npz>
+    exportar_modelo(sys.argv[1], sys.argv[2])
@@ -0,0 +1,196 @@
+import argparse
+import itertools
+import json
+import time
+import numpy as np
+import joblib
+
+from .exportar_modelo import compilar_pipeline
+from ..utils.motor_inferencia import MotorSVC
+from ..utils.tabla_etiquetas import TablaEtiquetas, VERSION_TABLA
+
+# Dominio de cada característica numérica; coincide con la validación del endpoint.
+# La edad empieza en 0.5 para que con ancho 1 cada entero caiga en el centro de su intervalo
+DOMINIOS = {
+    'Edad': (0.5, 120.5),
+    'Peso (kg)': (0.0, 300.0),
+    'Altura (cm)': (0.0, 250.0)
+}
+
+# Ancho de intervalo por defecto de cada característica numérica
+ANCHOS_POR_DEFECTO = {
+    'Edad': 2.0,
+    'Peso (kg)': 5.0,
+    'Altura (cm)': 5.0
+}
+
+
+def cargar_motor(ruta_modelo: str) -> MotorSVC:
+    """Cargar el motor compilado desde un .npz o compilarlo desde el pipeline de joblib"""
+    if ruta_modelo.endswith('.npz'):
+        return MotorSVC.cargar(ruta_modelo)
+    return MotorSVC(compilar_pipeline(joblib.load(ruta_modelo)))
+
+
+def _factores_numericos(motor: MotorSVC, centros: list) -> list:
+    """
+    Factor del kernel RBF de cada característica numérica
+
+    El kernel RBF se separa en un producto por dimensión, así que para cada
+    característica se calcula exp(-gamma * (z - sv)^2) en los centros de sus
+    intervalos ya estandarizados.
+    """
+    factores = []
+    for k, valores in enumerate(centros):
+        z = (valores - motor.media[k]) / motor.escala[k]
+        sv = motor.vectores_soporte[:, motor.inicio_numericas + k]
+        factores.append(np.exp(-motor.gamma * (z[:, None] - sv[None, :]) ** 2))
+    return factores
+
+
+def _decisiones_rejilla(factores: list, pesos: np.ndarray) -> np.ndarray:
+    """
+    Evaluar sum_s pesos[p, s] * prod_k factores[k][i_k, s] en toda la rejilla numérica
+
+    Returns:
+        np.ndarray de forma (n_1, ..., n_K, n_pares)
+    """
+    formas = [f.shape[0] for f in factores]
+    if len(factores) == 1:
+        return factores[0] @ pesos.T
+
+    penultimo, ultimo = factores[-2], factores[-1]
+    resultado = np.empty(formas + [pesos.shape[0]], dtype=np.float64)
+    for indices in itertools.product(*[range(n) for n in formas[:-2]]):
+        peso_fila = np.ones(ultimo.shape[1], dtype=np.float64)
+        for k, i in enumerate(indices):
+            peso_fila = peso_fila * factores[k][i]
+        for p in range(pesos.shape[0]):
+            resultado[indices + (slice(None), slice(None), p)] = (penultimo * (peso_fila * pesos[p])) @ ultimo.T
+    return resultado
+
+
+def generar_tabla(motor: MotorSVC, anchos: dict = None) -> tuple:
+    """
+    Evaluar el modelo en todas las celdas de la rejilla cuantizada
+
+    Args:
+        motor (MotorSVC): Modelo compilado
+        anchos (dict): Ancho de intervalo por característica numérica
+
+    Returns:
+        Tupla (tabla de índices de clase, metadatos)
+    """
+    anchos = dict(ANCHOS_POR_DEFECTO, **(anchos or {}))
+    columnas_numericas = motor.columnas_numericas
+
+    centros = []
+    for columna in columnas_numericas:
+        minimo, maximo = DOMINIOS[columna]
+        n_intervalos = int(np.ceil((maximo - minimo) / anchos[columna]))
+        centros.append(minimo + (np.arange(n_intervalos) + 0.5) * anchos[columna])
+    factores = _factores_numericos(motor, centros)
+
+    # Categorías conocidas de cada columna más una posición para desconocidas
+    categorias = [(columna, list(posiciones)) for columna, posiciones in motor.categorias.items()]
+    columnas_cat = np.array(
+        [p for _, posiciones in motor.categorias.items() for p in posiciones.values()], dtype=np.int64
+    )
+    sv_cat = motor.vectores_soporte[:, columnas_cat] if len(columnas_cat) else np.zeros((motor.vectores_soporte.shape[0], 0))
+    normas_sv_cat = np.einsum('ij,ij->i', sv_cat, sv_cat)
+
+    forma_cat = [len(valores) + 1 for _, valores in categorias]
+    tabla = np.empty([len(c) for c in centros] + forma_cat, dtype=np.uint8)
+
+    for combinacion in itertools.product(*[range(n) for n in forma_cat]):
+        x_cat = np.zeros(len(columnas_cat), dtype=np.float64)
+        desplazamiento = 0
+        for (columna, valores), indice in zip(categorias, combinacion):
+            if indice < len(valores):
+                x_cat[desplazamiento + indice] = 1.0
+            desplazamiento += len(valores)
+
+        # Parte categórica del kernel, constante para toda la rejilla numérica
+        distancia_cat = normas_sv_cat + x_cat @ x_cat - 2.0 * (sv_cat @ x_cat)
+        pesos = motor.coef_pares * np.exp(-motor.gamma * distancia_cat)[None, :]
+
+        decisiones = _decisiones_rejilla(factores, pesos) + motor.intercepto
+        decisiones = decisiones.reshape(-1, len(motor.intercepto))
+        if len(motor.classes_) == 2:
+            decisiones = decisiones[:, 0]
+        indices = motor.indices_clase(decisiones).reshape(tabla.shape[:len(centros)])
+        tabla[(Ellipsis,) + combinacion] = indices
+
+    metadatos = {
+        'version': VERSION_TABLA,
+        'columnas_numericas': columnas_numericas,
+        'dominios': {columna: DOMINIOS[columna] for columna in columnas_numericas},
+        'anchos': {columna: anchos[columna] for columna in columnas_numericas},
+        'categorias': categorias
+    }
+    return tabla, metadatos
+
+
+def medir_concordancia(motor: MotorSVC, tabla: TablaEtiquetas, n_muestras: int = 20000, semilla: int = 42) -> float:
+    """
+    Proporción de perfiles aleatorios en que la tabla coincide con el modelo exacto
+
+    Los perfiles cubren todo el dominio del endpoint: edad entera, peso y
+    altura continuos, y todas las categorías más un valor desconocido.
+    """
+    rng = np.random.default_rng(semilla)
+    perfiles = []
+    for _ in range(n_muestras):
+        perfil = {}
+        for columna in motor.columnas_numericas:
+            minimo, maximo = DOMINIOS[columna]
+            if columna == 'Edad':
+                perfil[columna] = int(rng.integers(1, 120))
+            else:
+                perfil[columna] = float(rng.uniform(minimo, maximo))
+        for columna, posiciones in motor.categorias.items():
+            valores = list(posiciones) + ['__desconocido__']
+            perfil[columna] = valores[rng.integers(len(valores))]
+        perfiles.append(perfil)
+
+    return float(np.mean(motor.predict(perfiles) == tabla.predict(perfiles)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precalcular la tabla perfil → etiqueta")
+    parser.add_argument('modelo', help="Modelo compilado (.npz) o pipeline de joblib")
+    parser.add_argument('salida', help="Archivo .npz de salida")
+    parser.add_argument('--ancho', action='append', default=[], metavar='COLUMNA=VALOR',
+                        help="Ancho de intervalo, por ejemplo --ancho 'Peso (kg)=1'")
+    parser.add_argument('--muestras', type=int, default=20000, help="Perfiles para medir la concordancia")
+    args = parser.parse_args()
+
+    anchos = {}
+    for ancho in args.ancho:
+        columna, valor = ancho.rsplit('=', 1)
+        anchos[columna] = float(valor)
+
+    motor = cargar_motor(args.modelo)
+
+    inicio = time.time()
+    tabla, metadatos = generar_tabla(motor, anchos)
+    tiempo = time.time() - inicio
+
+    metadatos['concordancia'] = medir_concordancia(motor, TablaEtiquetas(tabla, motor.classes_, metadatos), args.muestras)
+    metadatos['muestras_concordancia'] = args.muestras
+
+    np.savez_compressed(
+        args.salida,
+        tabla=tabla,
+        clases=motor.classes_,
+        metadatos=np.array(json.dumps(metadatos, ensure_ascii=False))
+    )
+    print(f"Tabla guardada en {args.salida}")
+    print(f"- Forma: {tabla.shape} ({tabla.nbytes / 1e6:.1f} MB)")
+    print(f"- Tiempo de generación: {tiempo:.2f} segundos")
+    print(f"- Concordancia con el modelo exacto: {metadatos['concordancia']:.4%}")
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.models.generar_tabla_etiquetas <modelo> <salida.npz> [--ancho COLUMNA=VALOR]
+    main()
@@ -0,0 +1,351 @@
+import csv
+import io
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+from sqlalchemy import MetaData, func, select
+from sqlalchemy.engine import Engine
+
+from .parseo_listas import diccionario_nutricion, parsear_columna
+
+# Recetas procesadas por lote: cada lote se inserta en una sola transacción
+TAMANO_LOTE = 5000
+
+# Tablas del esquema normalizado en un orden que respeta las claves foráneas
+TABLAS = ('ingredients', 'tags', 'recipes', 'recipe_ingredient', 'recipe_tag', 'steps', 'nutrition')
+
+# Filas del CSV leídas por bloque en la carga por streaming
+TAMANO_BLOQUE = 10000
+
+# Valores por consulta IN al buscar nombres existentes
+TAMANO_IN = 500
+
+# Columnas del CSV con literales de listas de Python
+COLUMNAS_LISTA = ('ingredients', 'tags', 'steps', 'nutrition')
+
+
+def limpiar_recetas(df: pd.DataFrame) -> pd.DataFrame:
+    """Descartar filas sin los campos obligatorios y convertir los numéricos"""
+    df = df.dropna(subset=['name', 'minutes', 'n_steps', 'n_ingredients'])
+    df['minutes'] = pd.to_numeric(df['minutes'], errors='coerce')
+    df['n_steps'] = pd.to_numeric(df['n_steps'], errors='coerce').astype(int)
+    df['n_ingredients'] = pd.to_numeric(df['n_ingredients'], errors='coerce').astype(int)
+    return df
+
+
+class CargaMasiva:
+    """
+    Carga masiva del CSV de recetas en el esquema normalizado
+
+    Los ids de ingredientes y etiquetas se resuelven con diccionarios
+    nombre → id en memoria y los ids de las recetas se asignan en el cliente,
+    así que no hace falta un SELECT por ingrediente ni un flush por receta.
+    Cada tabla se inserta por lotes: con COPY en PostgreSQL (psycopg2) y con
+    executemany en los demás motores, por ejemplo SQLite.
+
+    Args:
+        engine (Engine): Motor de SQLAlchemy de la base de datos
+        metadata (MetaData): Metadatos con las tablas del esquema normalizado
+        tamano_lote (int): Recetas por lote
+    """
+
+    def __init__(self, engine: Engine, metadata: MetaData, tamano_lote: int = TAMANO_LOTE):
+        self.engine = engine
+        self.tablas = metadata.tables
+        self.tamano_lote = tamano_lote
+        self.fallos_parseo = 0
+        self.usar_copy = engine.dialect.name == 'postgresql' and engine.dialect.driver == 'psycopg2'
+
+        # Mapas nombre → id y siguiente id libre de cada tabla con ids asignados en el cliente
+        self.mapas = {'ingredients': {}, 'tags': {}}
+        self.siguientes = {'recipes': 1, 'ingredients': 1, 'tags': 1}
+
+    def _cargar_estado(self, conexion, nombres: Optional[Dict[str, set]] = None):
+        """
+        Leer los mapas nombre → id y el siguiente id libre de cada tabla
+
+        Args:
+            conexion: Conexión abierta
+            nombres (dict): Si se indica, solo se leen estos nombres de cada tabla
+                en lugar de la tabla completa
+        """
+        for nombre_tabla, mapa in self.mapas.items():
+            tabla = self.tablas[nombre_tabla]
+            mapa.clear()
+            if nombres is None:
+                mapa.update({nombre: id_ for id_, nombre in conexion.execute(select(tabla.c.id, tabla.c.name))})
+            else:
+                mapa.update(self._buscar_nombres(conexion, nombre_tabla, nombres[nombre_tabla]))
+        for nombre_tabla in self.siguientes:
+            tabla = self.tablas[nombre_tabla]
+            self.siguientes[nombre_tabla] = (conexion.execute(select(func.max(tabla.c.id))).scalar() or 0) + 1
+
+    def _buscar_nombres(self, conexion, nombre_tabla: str, nombres: Iterable[str]) -> Dict[str, int]:
+        """Mapa nombre → id de los nombres que ya existen en la tabla, consultados en grupos de TAMANO_IN"""
+        tabla = self.tablas[nombre_tabla]
+        nombres = list(nombres)
+        encontrados = {}
+        for desde in range(0, len(nombres), TAMANO_IN):
+            grupo = nombres[desde:desde + TAMANO_IN]
+            consulta = select(tabla.c.id, tabla.c.name).where(tabla.c.name.in_(grupo))
+            encontrados.update({nombre: id_fila for id_fila, nombre in conexion.execute(consulta)})
+        return encontrados
+
+    def _siguiente_id(self, nombre_tabla: str) -> int:
+        id_ = self.siguientes[nombre_tabla]
+        self.siguientes[nombre_tabla] += 1
+        return id_
+
+    def _resolver(self, nombre_tabla: str, nombre: str, nuevos: List[Dict]) -> int:
+        """Id de un ingrediente o etiqueta; los nombres nuevos se agregan al mapa y a la lista de inserción"""
+        mapa = self.mapas[nombre_tabla]
+        id_ = mapa.get(nombre)
+        if id_ is None:
+            id_ = self._siguiente_id(nombre_tabla)
+            mapa[nombre] = id_
+            nuevos.append({'id': id_, 'name': nombre})
+        return id_
+
+    def _parsear_lote(self, lote: pd.DataFrame) -> Dict[str, list]:
+        """Parsear las columnas de listas del lote; las celdas que fallan se acumulan en fallos_parseo"""
+        listas = {}
+        for columna in COLUMNAS_LISTA:
+            listas[columna], fallos = parsear_columna(lote[columna])
+            self.fallos_parseo += fallos
+        return listas
+
+    @staticmethod
+    def _nombres_lote(listas: Dict[str, pd.Series]) -> Dict[str, set]:
+        """Ingredientes y etiquetas distintos que aparecen en un lote ya parseado"""
+        return {
+            columna: {nombre for celda in listas[columna] for nombre in celda if not pd.isna(nombre)}
+            for columna in ('ingredients', 'tags')
+        }
+
+    def _filas_lote(self, lote: pd.DataFrame, listas: Dict[str, pd.Series]) -> dict:
+        """Convertir un lote del CSV y sus listas parseadas en las filas de cada tabla"""
+        filas = {nombre_tabla: [] for nombre_tabla in TABLAS}
+
+        for row, ingredientes, etiquetas, pasos, nutricion in zip(
+            lote.itertuples(index=False), listas['ingredients'], listas['tags'], listas['steps'], listas['nutrition']
+        ):
+            recipe_id = self._siguiente_id('recipes')
+            filas['recipes'].append({
+                'id': recipe_id,
+                'name': str(row.name),
+                'minutes': float(row.minutes),
+                'n_steps': int(row.n_steps),
+                'n_ingredients': int(row.n_ingredients)
+            })
+
+            # Un ingrediente o etiqueta repetido en la misma receta se asocia una sola vez
+            vistos = set()
+            for nombre in ingredientes:
+                if pd.isna(nombre):
+                    continue
+                id_ = self._resolver('ingredients', nombre, filas['ingredients'])
+                if id_ not in vistos:
+                    vistos.add(id_)
+                    filas['recipe_ingredient'].append({'recipe_id': recipe_id, 'ingredient_id': id_})
+
+            vistos = set()
+            for nombre in etiquetas:
+                if pd.isna(nombre):
+                    continue
+                id_ = self._resolver('tags', nombre, filas['tags'])
+                if id_ not in vistos:
+                    vistos.add(id_)
+                    filas['recipe_tag'].append({'recipe_id': recipe_id, 'tag_id': id_})
+
+            for step_number, descripcion in enumerate(pasos, 1):
+                if pd.isna(descripcion):
+                    continue
+                filas['steps'].append({'recipe_id': recipe_id, 'step_number': step_number, 'description': descripcion})
+
+            filas['nutrition'].append(dict(recipe_id=recipe_id, **diccionario_nutricion(nutricion)))
+        return filas
+
+    def _copy(self, conexion, nombre_tabla: str, filas: List[Dict]):
+        """Insertar filas con COPY ... FROM STDIN en formato CSV"""
+        columnas = list(filas[0])
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for fila in filas:
+            escritor.writerow(['' if fila[c] is None else fila[c] for c in columnas])
+        buffer.seek(0)
+        cursor = conexion.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {nombre_tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    def _insertar(self, conexion, filas: dict):
+        for nombre_tabla in TABLAS:
+            if not filas[nombre_tabla]:
+                continue
+            if self.usar_copy:
+                self._copy(conexion, nombre_tabla, filas[nombre_tabla])
+            else:
+                conexion.execute(self.tablas[nombre_tabla].insert(), filas[nombre_tabla])
+
+    def _sincronizar_secuencias(self, conexion):
+        """En PostgreSQL las secuencias deben seguir a los ids asignados en el cliente"""
+        if self.engine.dialect.name != 'postgresql':
+            return
+        for nombre_tabla in ('recipes', 'ingredients', 'tags'):
+            conexion.exec_driver_sql(
+                f"SELECT setval(pg_get_serial_sequence('{nombre_tabla}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {nombre_tabla}), 0) + 1, false)"
+            )
+
+    def cargar(self, df: pd.DataFrame) -> dict:
+        """
+        Insertar todas las recetas del DataFrame por lotes
+
+        Args:
+            df (pd.DataFrame): Recetas ya limpias y sin las que existen en la base
+
+        Returns:
+            Diccionario con recetas insertadas, filas totales, celdas sin parsear, segundos y filas por segundo
+        """
+        inicio = time.perf_counter()
+        self.fallos_parseo = 0
+        recetas = 0
+        filas_totales = 0
+
+        with self.engine.begin() as conexion:
+            self._cargar_estado(conexion)
+
+        for desde in range(0, len(df), self.tamano_lote):
+            lote = df.iloc[desde:desde + self.tamano_lote]
+            filas = self._filas_lote(lote, self._parsear_lote(lote))
+            try:
+                with self.engine.begin() as conexion:
+                    self._insertar(conexion, filas)
+            except Exception:
+                # Los mapas en memoria pueden tener ids que no llegaron a insertarse
+                with self.engine.begin() as conexion:
+                    self._cargar_estado(conexion)
+                raise
+            recetas += len(lote)
+            filas_totales += sum(len(f) for f in filas.values())
+            transcurrido = time.perf_counter() - inicio
+            print(f"Progreso: {recetas}/{len(df)} recetas ({recetas / transcurrido:.0f} recetas/s)")
+
+        with self.engine.begin() as conexion:
+            self._sincronizar_secuencias(conexion)
+
+        segundos = time.perf_counter() - inicio
+        return {
+            'recetas': recetas,
+            'filas': filas_totales,
+            'fallos_parseo': self.fallos_parseo,
+            'segundos': segundos,
+            'recetas_por_segundo': recetas / segundos if segundos > 0 else 0.0,
+            'filas_por_segundo': filas_totales / segundos if segundos > 0 else 0.0
+        }
+
+    def _leer_checkpoint(self, ruta_checkpoint: str, csv_path: str) -> int:
+        """Filas del CSV ya procesadas según el checkpoint, o 0 si no hay uno válido"""
+        if not os.path.exists(ruta_checkpoint):
+            return 0
+        with open(ruta_checkpoint, encoding='utf-8') as archivo:
+            checkpoint = json.load(archivo)
+        if checkpoint.get('csv') != os.path.abspath(csv_path) or checkpoint.get('bytes') != os.path.getsize(csv_path):
+            print("El checkpoint corresponde a otro archivo; se empieza desde el principio.")
+            return 0
+        return int(checkpoint['filas'])
+
+    @staticmethod
+    def _escribir_checkpoint(ruta_checkpoint: str, csv_path: str, filas: int):
+        """Guardar las filas procesadas; se escribe a un temporal y se renombra para no dejarlo a medias"""
+        temporal = f"{ruta_checkpoint}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump({'csv': os.path.abspath(csv_path), 'bytes': os.path.getsize(csv_path), 'filas': filas}, archivo)
+        os.replace(temporal, ruta_checkpoint)
+
+    def cargar_por_bloques(self, csv_path: str, tamano_bloque: int = TAMANO_BLOQUE, limit: Optional[int] = None,
+                           ruta_checkpoint: Optional[str] = None) -> dict:
+        """
+        Cargar el CSV por bloques sin tenerlo completo en memoria
+
+        Cada bloque se limpia, se conserva solo la primera aparición de cada
+        nombre, se descartan las recetas que ya existen consultando solo sus
+        nombres, se resuelven los ids de sus ingredientes y etiquetas de la
+        misma forma y se inserta en una transacción. Tras el
+        commit se guarda en el checkpoint el número de filas del CSV
+        procesadas, así que una carga interrumpida continúa desde el último
+        bloque confirmado. Al terminar el checkpoint se elimina.
+
+        Args:
+            csv_path (str): Ruta al CSV de recetas
+            tamano_bloque (int): Filas del CSV por bloque
+            limit (int): Máximo de filas del CSV a procesar, contando las ya procesadas
+            ruta_checkpoint (str): Archivo de checkpoint; por defecto junto al CSV
+
+        Returns:
+            Diccionario con recetas insertadas, omitidas, filas totales, celdas sin parsear, segundos y velocidades
+        """
+        ruta_checkpoint = ruta_checkpoint or f"{csv_path}.checkpoint.json"
+        procesadas = self._leer_checkpoint(ruta_checkpoint, csv_path)
+        if procesadas:
+            print(f"Reanudando desde la fila {procesadas} del CSV")
+
+        inicio = time.perf_counter()
+        self.fallos_parseo = 0
+        recetas = 0
+        omitidas = 0
+        filas_totales = 0
+
+        if limit is not None and procesadas >= limit:
+            bloques = []
+        else:
+            bloques = pd.read_csv(
+                csv_path,
+                chunksize=tamano_bloque,
+                skiprows=lambda i: 0 < i <= procesadas,
+                nrows=None if limit is None else limit - procesadas
+            )
+
+        for bloque in bloques:
+            leidas = len(bloque)
+            bloque = limpiar_recetas(bloque)
+            # Un nombre repetido dentro del bloque cuenta como ya existente, igual que en los modos 'orm' y 'masivo'
+            limpias = len(bloque)
+            bloque = bloque.drop_duplicates(subset='name')
+
+            with self.engine.begin() as conexion:
+                existentes = self._buscar_nombres(conexion, 'recipes', set(bloque['name'].astype(str)))
+                nuevas = bloque[~bloque['name'].astype(str).isin(existentes)]
+                if len(nuevas):
+                    listas = self._parsear_lote(nuevas)
+                    self._cargar_estado(conexion, self._nombres_lote(listas))
+                    filas = self._filas_lote(nuevas, listas)
+                    self._insertar(conexion, filas)
+                    filas_totales += sum(len(f) for f in filas.values())
+
+            procesadas += leidas
+            recetas += len(nuevas)
+            omitidas += limpias - len(nuevas)
+            self._escribir_checkpoint(ruta_checkpoint, csv_path, procesadas)
+            transcurrido = time.perf_counter() - inicio
+            print(f"Progreso: fila {procesadas} del CSV, {recetas} recetas nuevas ({recetas / transcurrido:.0f} recetas/s)")
+
+        with self.engine.begin() as conexion:
+            self._sincronizar_secuencias(conexion)
+        if os.path.exists(ruta_checkpoint):
+            os.remove(ruta_checkpoint)
+
+        segundos = time.perf_counter() - inicio
+        return {
+            'recetas': recetas,
+            'omitidas': omitidas,
+            'filas': filas_totales,
+            'fallos_parseo': self.fallos_parseo,
+            'segundos': segundos,
+            'recetas_por_segundo': recetas / segundos if segundos > 0 else 0.0,
+            'filas_por_segundo': filas_totales / segundos if segundos > 0 else 0.0
+        }
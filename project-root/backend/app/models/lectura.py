@@ -0,0 +1,170 @@
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterator, List, Optional
+
+import pandas as pd
+from sqlalchemy import MetaData, func, select
+from sqlalchemy.engine import Engine
+
+from .parseo_listas import CAMPOS_NUTRICION
+
+# Recetas por DataFrame devuelto y filas que el cursor del servidor trae por viaje
+TAMANO_LOTE_LECTURA = 5000
+
+# Columnas del DataFrame: el id de la receta y las mismas del CSV original
+COLUMNAS_RECETA = ('id', 'name', 'minutes', 'n_steps', 'n_ingredients', 'ingredients', 'steps', 'tags', 'nutrition')
+
+
+class _FlujoAgrupado:
+    """
+    Filas de una tabla hija ordenadas por recipe_id, consumidas receta a receta
+
+    Args:
+        resultado: Resultado de la consulta; la primera columna es recipe_id
+        valor (callable): Convierte una fila en el valor que se agrega a la lista
+    """
+
+    def __init__(self, resultado, valor):
+        self.grupos = groupby(resultado, key=itemgetter(0))
+        self.valor = valor
+        self.actual = next(self.grupos, None)
+
+    def tomar(self, recipe_id: int) -> Optional[list]:
+        """Valores de la receta indicada, o None si no tiene filas; los ids deben pedirse en orden"""
+        while self.actual is not None and self.actual[0] < recipe_id:
+            self.actual = next(self.grupos, None)
+        if self.actual is None or self.actual[0] != recipe_id:
+            return None
+        valores = [self.valor(fila) for fila in self.actual[1]]
+        self.actual = next(self.grupos, None)
+        return valores
+
+
+class LecturaRecetas:
+    """
+    Lectura desnormalizada de las recetas con un número fijo de consultas
+
+    En lugar de cargar cada receta y luego sus ingredientes, etiquetas, pasos
+    y nutrición de forma perezosa (varias consultas por receta), se lanzan
+    cinco consultas ordenadas por id de receta, una por tabla, y se combinan
+    en Python recorriéndolas a la vez. Las consultas usan cursores del lado
+    del servidor (stream_results), así que la memoria depende del tamaño del
+    lote y no del catálogo. Las listas se devuelven como listas de Python.
+
+    Args:
+        engine (Engine): Motor de SQLAlchemy de la base de datos
+        metadata (MetaData): Metadatos con las tablas del esquema normalizado
+        tamano_lote (int): Recetas por DataFrame
+    """
+
+    def __init__(self, engine: Engine, metadata: MetaData, tamano_lote: int = TAMANO_LOTE_LECTURA):
+        self.engine = engine
+        self.tablas = metadata.tables
+        self.tamano_lote = tamano_lote
+
+    def _consultas(self, limit: Optional[int], desde_id: Optional[int]) -> dict:
+        """Consultas de recetas y de cada tabla hija, todas ordenadas por id de receta"""
+        recipes = self.tablas['recipes']
+        ingredients = self.tablas['ingredients']
+        tags = self.tablas['tags']
+        recipe_ingredient = self.tablas['recipe_ingredient']
+        recipe_tag = self.tablas['recipe_tag']
+        steps = self.tablas['steps']
+        nutrition = self.tablas['nutrition']
+
+        consulta_recetas = select(
+            recipes.c.id, recipes.c.name, recipes.c.minutes, recipes.c.n_steps, recipes.c.n_ingredients
+        ).order_by(recipes.c.id)
+        ids = select(recipes.c.id).order_by(recipes.c.id)
+        if desde_id is not None:
+            consulta_recetas = consulta_recetas.where(recipes.c.id > desde_id)
+            ids = ids.where(recipes.c.id > desde_id)
+        if limit is not None:
+            consulta_recetas = consulta_recetas.limit(limit)
+            ids = ids.limit(limit)
+        ids = ids.subquery()
+
+        def hasta_limite(consulta, columna_receta):
+            # Las tablas hijas solo se leen en el rango de recetas incluidas
+            if desde_id is not None:
+                consulta = consulta.where(columna_receta > desde_id)
+            if limit is not None:
+                consulta = consulta.where(columna_receta <= select(func.max(ids.c.id)).scalar_subquery())
+            return consulta
+
+        return {
+            'recetas': consulta_recetas,
+            'ingredients': hasta_limite(
+                select(recipe_ingredient.c.recipe_id, ingredients.c.name)
+                .join(ingredients, ingredients.c.id == recipe_ingredient.c.ingredient_id)
+                .order_by(recipe_ingredient.c.recipe_id, ingredients.c.id),
+                recipe_ingredient.c.recipe_id
+            ),
+            'tags': hasta_limite(
+                select(recipe_tag.c.recipe_id, tags.c.name)
+                .join(tags, tags.c.id == recipe_tag.c.tag_id)
+                .order_by(recipe_tag.c.recipe_id, tags.c.id),
+                recipe_tag.c.recipe_id
+            ),
+            'steps': hasta_limite(
+                select(steps.c.recipe_id, steps.c.description)
+                .order_by(steps.c.recipe_id, steps.c.step_number),
+                steps.c.recipe_id
+            ),
+            'nutrition': hasta_limite(
+                select(nutrition.c.recipe_id, *(nutrition.c[campo] for campo in CAMPOS_NUTRICION))
+                .order_by(nutrition.c.recipe_id),
+                nutrition.c.recipe_id
+            )
+        }
+
+    def lotes(self, limit: Optional[int] = None, desde_id: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Recorrer las recetas en DataFrames de tamano_lote filas
+
+        Args:
+            limit (int): Máximo de recetas, en orden de id; None para todo el catálogo
+            desde_id (int): Leer solo recetas con id mayor que este (las añadidas después)
+
+        Returns:
+            Iterador de DataFrames con las columnas de COLUMNAS_RECETA; ingredients,
+            steps, tags y nutrition son listas
+        """
+        consultas = self._consultas(limit, desde_id)
+        with self.engine.connect() as conexion:
+            streaming = conexion.execution_options(stream_results=True, yield_per=self.tamano_lote)
+            recetas = streaming.execute(consultas['recetas'])
+            flujos = {
+                'ingredients': _FlujoAgrupado(streaming.execute(consultas['ingredients']), itemgetter(1)),
+                'tags': _FlujoAgrupado(streaming.execute(consultas['tags']), itemgetter(1)),
+                'steps': _FlujoAgrupado(streaming.execute(consultas['steps']), itemgetter(1)),
+                'nutrition': _FlujoAgrupado(streaming.execute(consultas['nutrition']), lambda fila: list(fila[1:]))
+            }
+
+            for filas in recetas.partitions():
+                lote = {columna: [] for columna in COLUMNAS_RECETA}
+                for recipe_id, name, minutes, n_steps, n_ingredients in filas:
+                    lote['id'].append(recipe_id)
+                    lote['name'].append(name)
+                    lote['minutes'].append(minutes)
+                    lote['n_steps'].append(n_steps)
+                    lote['n_ingredients'].append(n_ingredients)
+                    lote['ingredients'].append(flujos['ingredients'].tomar(recipe_id) or [])
+                    lote['steps'].append(flujos['steps'].tomar(recipe_id) or [])
+                    lote['tags'].append(flujos['tags'].tomar(recipe_id) or [])
+                    nutricion = flujos['nutrition'].tomar(recipe_id)
+                    lote['nutrition'].append(nutricion[0] if nutricion else [0.0] * len(CAMPOS_NUTRICION))
+                yield pd.DataFrame(lote, columns=list(COLUMNAS_RECETA))
+
+    def etiquetas(self) -> List[str]:
+        """Nombres de todas las etiquetas de la tabla tags (el vocabulario completo del catálogo)"""
+        tags = self.tablas['tags']
+        with self.engine.connect() as conexion:
+            return list(conexion.execute(select(tags.c.name).order_by(tags.c.id)).scalars())
+
+    def leer(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """Todas las recetas pedidas en un solo DataFrame"""
+        lotes = list(self.lotes(limit))
+        if not lotes:
+            return pd.DataFrame(columns=list(COLUMNAS_RECETA))
+        return pd.concat(lotes, ignore_index=True)
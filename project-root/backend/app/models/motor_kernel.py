@@ -0,0 +1,193 @@
+import time
+from typing import Dict, List, Tuple
+
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import Ridge
+from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error, median_absolute_error
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MaxAbsScaler
+
+# Dimensión de la aproximación de Nystroem (columnas de la proyección RBF)
+N_COMPONENTES = 1000
+
+# Filas usadas para elegir gamma y alpha; el ajuste final usa todas
+FILAS_BUSQUEDA = 20000
+
+# Filas transformadas a la vez: la proyección es densa (filas × N_COMPONENTES)
+FILAS_POR_BLOQUE = 10000
+
+# Candidatos: gamma como múltiplo del gamma='scale' de SVR y regularización de Ridge
+MULTIPLICADORES_GAMMA = (0.3, 1.0, 3.0)
+ALPHAS = (0.1, 1.0, 10.0)
+
+
+def _bloques(n_filas: int, tamano: int = FILAS_POR_BLOQUE):
+    for desde in range(0, n_filas, tamano):
+        yield slice(desde, min(desde + tamano, n_filas))
+
+
+class MotorKernelAproximado:
+    """
+    Regresor de tiempos con aproximación explícita del kernel RBF
+
+    Sustituye al SVR exacto, cuyo entrenamiento crece con el cuadrado de las
+    filas, por MaxAbsScaler + Nystroem + Ridge: la proyección de Nystroem
+    aproxima el mismo kernel RBF con N_COMPONENTES columnas y el modelo
+    lineal se ajusta en tiempo lineal en las filas. Ridge se resuelve con
+    las ecuaciones normales acumuladas por bloques, así que la memoria
+    depende de N_COMPONENTES² y no del número de recetas.
+
+    Expone la misma interfaz que ImprovedSVMRecipeRecommender (train_model,
+    evaluate_model, predict, save_model) y model es un Pipeline normal de
+    scikit-learn.
+
+    Args:
+        n_componentes (int): Columnas de la aproximación de Nystroem
+        filas_busqueda (int): Filas de la muestra para elegir gamma y alpha
+        semilla (int): Semilla de la muestra y de Nystroem
+    """
+
+    def __init__(self, n_componentes: int = N_COMPONENTES, filas_busqueda: int = FILAS_BUSQUEDA, semilla: int = 42):
+        self.n_componentes = n_componentes
+        self.filas_busqueda = filas_busqueda
+        self.semilla = semilla
+        self.model = None
+        self.best_params = None
+        self.search_results = None
+
+    def create_pipeline(self, gamma: float, alpha: float) -> Pipeline:
+        return Pipeline([
+            ('scaler', MaxAbsScaler()),
+            ('nystroem', Nystroem(kernel='rbf', gamma=gamma, n_components=self.n_componentes,
+                                  random_state=self.semilla)),
+            ('ridge', Ridge(alpha=alpha))
+        ])
+
+    @staticmethod
+    def _gamma_escala(X) -> float:
+        """El gamma que usaría SVR(gamma='scale'): 1 / (columnas × varianza de X)"""
+        if sparse.issparse(X):
+            media = X.sum() / np.prod(X.shape)
+            varianza = X.multiply(X).sum() / np.prod(X.shape) - media ** 2
+        else:
+            varianza = np.asarray(X, dtype=float).var()
+        return 1.0 / (X.shape[1] * varianza) if varianza > 0 else 1.0
+
+    @staticmethod
+    def _acumular(nystroem: Nystroem, X, y: np.ndarray) -> dict:
+        """Ecuaciones normales Z^T Z y Z^T y de la proyección, calculadas por bloques"""
+        n = nystroem.components_.shape[0]
+        ZtZ = np.zeros((n, n))
+        Zty = np.zeros(n)
+        suma_z = np.zeros(n)
+        for bloque in _bloques(X.shape[0]):
+            Z = nystroem.transform(X[bloque])
+            ZtZ += Z.T @ Z
+            Zty += Z.T @ y[bloque]
+            suma_z += Z.sum(axis=0)
+        return {'ZtZ': ZtZ, 'Zty': Zty, 'suma_z': suma_z, 'suma_y': float(y.sum()), 'filas': X.shape[0]}
+
+    @staticmethod
+    def _resolver(estadisticas: dict, alpha: float) -> Tuple[np.ndarray, float]:
+        """Coeficientes e intercepto de Ridge(alpha) con intercepto, igual que Ridge.fit"""
+        filas = estadisticas['filas']
+        media_z = estadisticas['suma_z'] / filas
+        media_y = estadisticas['suma_y'] / filas
+        ZtZ = estadisticas['ZtZ'] - filas * np.outer(media_z, media_z)
+        Zty = estadisticas['Zty'] - filas * media_z * media_y
+        coef = np.linalg.solve(ZtZ + alpha * np.eye(len(Zty)), Zty)
+        return coef, float(media_y - media_z @ coef)
+
+    def _ajustar(self, X, y: np.ndarray, gamma: float, alphas) -> Tuple[Pipeline, Dict[float, Tuple[np.ndarray, float]]]:
+        """Ajustar escalador y Nystroem y resolver Ridge para cada alpha sin repetir la proyección"""
+        pipeline = self.create_pipeline(gamma, alphas[0])
+        escalador = pipeline.named_steps['scaler'].fit(X)
+        X_escalada = escalador.transform(X)
+        nystroem = pipeline.named_steps['nystroem'].fit(X_escalada)
+        estadisticas = self._acumular(nystroem, X_escalada, y)
+        return pipeline, {alpha: self._resolver(estadisticas, alpha) for alpha in alphas}
+
+    @staticmethod
+    def _fijar_ridge(pipeline: Pipeline, alpha: float, coef: np.ndarray, intercepto: float):
+        ridge = pipeline.named_steps['ridge']
+        ridge.set_params(alpha=alpha)
+        ridge.coef_ = coef
+        ridge.intercept_ = intercepto
+        ridge.n_features_in_ = len(coef)
+
+    def train_model(self, X_train, y_train) -> Tuple[dict, float]:
+        """
+        Elegir gamma y alpha en una muestra y ajustar el modelo con todas las filas
+
+        Returns:
+            Tupla (mejores parámetros, segundos de entrenamiento)
+        """
+        start_time = time.time()
+        y_train = np.asarray(y_train, dtype=float)
+        rng = np.random.default_rng(self.semilla)
+
+        # Muestra de búsqueda dividida en entrenamiento y validación (80/20)
+        muestra = rng.permutation(X_train.shape[0])[:self.filas_busqueda]
+        corte = int(len(muestra) * 0.8)
+        ajuste, validacion = np.sort(muestra[:corte]), np.sort(muestra[corte:])
+        gamma_escala = self._gamma_escala(MaxAbsScaler().fit_transform(X_train[ajuste]))
+
+        resultados: List[Dict] = []
+        for multiplicador in MULTIPLICADORES_GAMMA:
+            gamma = gamma_escala * multiplicador
+            inicio = time.time()
+            pipeline, soluciones = self._ajustar(X_train[ajuste], y_train[ajuste], gamma, ALPHAS)
+            tiempo_ajuste = (time.time() - inicio) / len(ALPHAS)
+            for alpha, (coef, intercepto) in soluciones.items():
+                self._fijar_ridge(pipeline, alpha, coef, intercepto)
+                puntuacion = r2_score(y_train[validacion], self.predict(X_train[validacion], pipeline))
+                resultados.append({
+                    'params': {'gamma': gamma, 'alpha': alpha},
+                    'mean_fit_time': tiempo_ajuste,
+                    'mean_test_score': float(puntuacion)
+                })
+
+        mejor = max(resultados, key=lambda resultado: resultado['mean_test_score'])['params']
+        self.model, soluciones = self._ajustar(X_train, y_train, mejor['gamma'], [mejor['alpha']])
+        self._fijar_ridge(self.model, mejor['alpha'], *soluciones[mejor['alpha']])
+
+        self.best_params = {**mejor, 'n_components': self.n_componentes}
+        self.search_results = resultados
+        return self.best_params, time.time() - start_time
+
+    def predict(self, X, pipeline: Pipeline = None) -> np.ndarray:
+        """Predecir por bloques para no materializar la proyección de todas las filas"""
+        pipeline = pipeline or self.model
+        if pipeline is None:
+            raise ValueError("El modelo no está entrenado. Llame primero a train_model.")
+        return np.concatenate([pipeline.predict(X[bloque]) for bloque in _bloques(X.shape[0])] or [np.empty(0)])
+
+    def evaluate_model(self, X_test, y_test) -> dict:
+        """Evaluar el modelo entrenado (mismas métricas que ImprovedSVMRecipeRecommender)."""
+        start_time = time.time()
+        y_pred = self.predict(X_test)
+        prediction_time = time.time() - start_time
+
+        return {
+            'r2_score': r2_score(y_test, y_pred),
+            'mse': mean_squared_error(y_test, y_pred),
+            'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
+            'mae': mean_absolute_error(y_test, y_pred),
+            'median_ae': median_absolute_error(y_test, y_pred),
+            'prediction_time': prediction_time
+        }
+
+    def save_model(self, path: str, **extra):
+        """Guardar el modelo con sus parámetros y la puntuación de cada candidato"""
+        if self.model is None:
+            raise ValueError("El modelo no está entrenado. Llame primero a train_model.")
+        joblib.dump({
+            'model': self.model,
+            'best_params': self.best_params,
+            'search_mode': 'kernel_aproximado',
+            'search_results': self.search_results,
+            **extra
+        }, path)
@@ -0,0 +1,159 @@
+import ast
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from json.encoder import encode_basestring
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Filas mínimas por proceso para que repartir una columna compense el coste de enviarla
+MIN_FILAS_POR_PROCESO = 50000
+
+# Campos de la columna 'nutrition' de RAW_recipes, en el orden del CSV
+CAMPOS_NUTRICION = ('calories', 'total_fat', 'sugar', 'sodium', 'protein', 'saturated_fat', 'carbohydrates')
+
+# Cadenas de un literal de Python sin barras invertidas: '...' o "..."
+_CADENA_PYTHON = re.compile(r"'([^']*)'|\"[^\"]*\"")
+
+
+def _parsear_lenta(celda: str):
+    """Parsear una celda con ast.literal_eval; devuelve None si no es una lista válida"""
+    try:
+        valor = ast.literal_eval(celda)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None
+    return valor if isinstance(valor, list) else None
+
+
+def _a_json(cadena: re.Match) -> str:
+    """Reescribir una cadena '...' como cadena JSON; las de comillas dobles ya lo son"""
+    contenido = cadena.group(1)
+    return cadena.group(0) if contenido is None else encode_basestring(contenido)
+
+
+def _decodificar_juntas(valores: List, indices: List[int], convertir) -> List:
+    """
+    Decodificar varias celdas con una sola llamada a json.loads
+
+    Las celdas convertidas a JSON se unen en un único arreglo. Si alguna
+    está mal formada se decodifican una a una y las que tampoco son JSON
+    pasan por ast.literal_eval.
+    """
+    try:
+        decodificadas = json.loads('[' + convertir(','.join(valores[i] for i in indices)) + ']')
+        if len(decodificadas) == len(indices):
+            return decodificadas
+    except ValueError:
+        pass
+    decodificadas = []
+    for i in indices:
+        try:
+            decodificadas.append(json.loads(convertir(valores[i])))
+        except ValueError:
+            decodificadas.append(_parsear_lenta(valores[i]))
+    return decodificadas
+
+
+def _parsear_valores(valores: List, default: List) -> Tuple[List[list], int]:
+    """
+    Parsear una lista de celdas con literales de listas de Python
+
+    Sin barras invertidas, repr() escribe cada cadena entre comillas simples
+    si no contiene ninguna y entre comillas dobles si contiene un apóstrofo,
+    como "baker's chocolate". Las celdas sin comillas dobles pasan a JSON
+    cambiando las comillas; las que tienen ambas, reescribiendo con una
+    expresión regular solo las cadenas de comillas simples. Cada grupo se
+    decodifica con una sola llamada a json.loads sobre todas sus celdas y
+    las celdas con secuencias de escape pasan por ast.literal_eval.
+
+    Returns:
+        Tupla (listas, fallos); las celdas que no se pueden parsear se
+        sustituyen por una copia de default y cuentan como fallos. Las
+        celdas vacías (NaN) también reciben default pero no cuentan, y las
+        que ya son listas se devuelven tal cual.
+    """
+    resultados = [None] * len(valores)
+    simples = []
+    mixtas = []
+    lentas = []
+    for i, celda in enumerate(valores):
+        if isinstance(celda, list):
+            resultados[i] = celda
+        elif not isinstance(celda, str):
+            resultados[i] = list(default)
+        elif '\\' in celda:
+            lentas.append(i)
+        elif '"' in celda:
+            mixtas.append(i)
+        else:
+            simples.append(i)
+
+    grupos = (
+        (simples, lambda texto: texto.replace("'", '"')),
+        (mixtas, lambda texto: _CADENA_PYTHON.sub(_a_json, texto)),
+    )
+    for indices, convertir in grupos:
+        if indices:
+            for i, valor in zip(indices, _decodificar_juntas(valores, indices, convertir)):
+                resultados[i] = valor if isinstance(valor, list) else None
+
+    for i in lentas:
+        resultados[i] = _parsear_lenta(valores[i])
+
+    fallos = 0
+    for i, valor in enumerate(resultados):
+        if valor is None:
+            resultados[i] = list(default)
+            fallos += 1
+    return resultados, fallos
+
+
+def parsear_columna(serie: pd.Series, default: Optional[List] = None, procesos: int = 0) -> Tuple[pd.Series, int]:
+    """
+    Parsear una columna completa de literales de listas de Python
+
+    Args:
+        serie (pd.Series): Columna con celdas como ['flour', "baker's chocolate"]
+        default (list): Valor para celdas vacías o que no se pueden parsear
+        procesos (int): Procesos para repartir columnas grandes; 0 o 1 parsea en este proceso
+
+    Returns:
+        Tupla (serie de listas con el mismo índice, número de celdas que no se pudieron parsear)
+    """
+    default = default or []
+    valores = serie.tolist()
+
+    n_partes = min(procesos, len(valores) // MIN_FILAS_POR_PROCESO)
+    if n_partes > 1:
+        limites = np.linspace(0, len(valores), n_partes + 1).astype(int)
+        partes = [valores[desde:hasta] for desde, hasta in zip(limites[:-1], limites[1:])]
+        with ProcessPoolExecutor(n_partes) as ejecutor:
+            resultados = list(ejecutor.map(_parsear_valores, partes, repeat(default)))
+        listas = [lista for parte, _ in resultados for lista in parte]
+        fallos = sum(fallos_parte for _, fallos_parte in resultados)
+    else:
+        listas, fallos = _parsear_valores(valores, default)
+
+    return pd.Series(listas, index=serie.index, dtype=object), fallos
+
+
+def parsear_lista(celda, default: Optional[List] = None) -> list:
+    """Parsear una sola celda; para columnas completas usar parsear_columna"""
+    listas, _ = _parsear_valores([celda], default or [])
+    return listas[0]
+
+
+def diccionario_nutricion(valores: List) -> Dict[str, float]:
+    """
+    Convertir la lista de la columna 'nutrition' en un diccionario por campo
+
+    Si faltan campos (menos de seis valores) se devuelven ceros; el séptimo
+    (carbohidratos) es opcional.
+    """
+    if len(valores) < len(CAMPOS_NUTRICION) - 1:
+        return {campo: 0.0 for campo in CAMPOS_NUTRICION}
+    valores = list(valores[:len(CAMPOS_NUTRICION)]) + [0.0] * (len(CAMPOS_NUTRICION) - len(valores))
+    return dict(zip(CAMPOS_NUTRICION, valores))
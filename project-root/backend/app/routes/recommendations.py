@@ -1,124 +1,419 @@
-from flask import Blueprint, request, jsonify
-import pandas as pd
+from flask import Blueprint, Response, request, jsonify
 import numpy as np
-import joblib
+from ..utils.catalogo import (
+    SIN_RESTRICCION, TIPOS_COMIDA, codificar_json, muestrear_por_calorias, muestrear_sin_reemplazo,
+    seleccionar_diversas
+)
+from ..utils.ejecutor_inferencia import ServicioSaturado
+from ..utils.metricas import MetricasEtapas, cabecera_server_timing
+from ..utils.nutricion import GENEROS, MULTIPLICADORES_ACTIVIDAD, NIVEL_ACTIVIDAD_POR_DEFECTO, calcular_tdee
+from ..utils.servicio_recomendaciones import ServicioRecomendaciones
 
 # Crear el blueprint
 recommendations_bp = Blueprint('recommendations', __name__)
 
-# Cargar modelo y dataset
+# Rutas del modelo y dataset
 MODEL_PATH = r'C:\Users\Jhon\Documents\8vo\Aplicaciones\proyecto\programa\project-root\backend\app\models\svm_recipes_model.joblib'
 DATASET_PATH = r'C:\Users\Jhon\Documents\8vo\Aplicaciones\proyecto\programa\project-root\backend\app\models\final_recipes.csv'
+# Artefacto generado con: python -m app.models.exportar_modelo <MODEL_PATH> <COMPILED_MODEL_PATH>
+COMPILED_MODEL_PATH = r'C:\Users\Jhon\Documents\8vo\Aplicaciones\proyecto\programa\project-root\backend\app\models\svm_recipes_model.npz'
+# Catálogo generado con: python -m app.utils.catalogo_columnar <DATASET_PATH> <CATALOG_PATH>
+CATALOG_PATH = r'C:\Users\Jhon\Documents\8vo\Aplicaciones\proyecto\programa\project-root\backend\app\models\final_recipes_columnar'
+# Tabla generada con: python -m app.models.generar_tabla_etiquetas <COMPILED_MODEL_PATH> <LABEL_TABLE_PATH>
+LABEL_TABLE_PATH = r'C:\Users\Jhon\Documents\8vo\Aplicaciones\proyecto\programa\project-root\backend\app\models\tabla_etiquetas.npz'
+# 'exacto' evalúa el modelo; 'tabla' responde indexando la tabla precalculada
+INFERENCE_MODE = 'exacto'
+# Procesos worker para la inferencia; con 0 se predice en el hilo de la petición
+INFERENCE_WORKERS = 0
+# Predicciones en vuelo permitidas antes de responder 503, y espera máxima en segundos
+INFERENCE_QUEUE_SIZE = 32
+INFERENCE_TIMEOUT = 5.0
 
-try:
-    model = joblib.load(MODEL_PATH)
-    recipes = pd.read_csv(DATASET_PATH)
-except Exception as e:
-    print(f"Error al cargar modelo o dataset: {e}")
-    recipes = pd.DataFrame()
+# Los recursos se cargan en el calentamiento de la app o en la primera petición
+servicio = ServicioRecomendaciones(
+    MODEL_PATH, COMPILED_MODEL_PATH, DATASET_PATH, CATALOG_PATH,
+    ruta_tabla=LABEL_TABLE_PATH, modo_inferencia=INFERENCE_MODE,
+    procesos_inferencia=INFERENCE_WORKERS, max_pendientes_inferencia=INFERENCE_QUEUE_SIZE,
+    timeout_inferencia=INFERENCE_TIMEOUT
+)
+
+# Máximo de perfiles aceptados en una petición por lotes
+MAX_BATCH_PROFILES = 1000
+
+# Recetas similares devueltas por defecto y como máximo
+DEFAULT_SIMILAR = 5
+MAX_SIMILAR = 50
+
+# 'aleatorio' elige cada comida por separado; 'calorias' ajusta cada día al TDEE del usuario;
+# 'diverso' evita platos parecidos entre sí dentro del plan
+PLAN_MODES = ['aleatorio', 'calorias', 'diverso']
+# Desviación relativa permitida entre las calorías del día y el TDEE en el modo 'calorias'
+CALORIE_TOLERANCE = 0.10
+
+# Claves de los tipos de comida ya codificadas para armar las respuestas
+MEAL_KEYS = {meal_type: codificar_json(meal_type) for meal_type in TIPOS_COMIDA}
+
+# Tiempos por etapa de las peticiones, consultables en /recommendations/metrics
+metricas = MetricasEtapas()
+# Agregar la cabecera Server-Timing con los tiempos por etapa a cada respuesta
+SERVER_TIMING = False
+
+@recommendations_bp.before_request
+def start_timing():
+    if request.endpoint != 'recommendations.get_metrics':
+        metricas.iniciar_peticion()
+
+@recommendations_bp.after_request
+def finish_timing(response):
+    tiempos = metricas.cerrar_peticion()
+    if SERVER_TIMING and tiempos:
+        response.headers['Server-Timing'] = cabecera_server_timing(tiempos)
+    return response
+
+def validate_profile(data):
+    """
+    Validar los datos de un perfil de usuario
+
+    Returns:
+        Tupla (perfil, error); perfil es None si hay un error de validación
+    """
+    if not isinstance(data, dict):
+        return None, "El perfil debe ser un objeto JSON."
+
+    # Validar datos de entrada
+    required_fields = ['edad', 'peso', 'altura', 'restricciones', 'preferencia', 'dias']
+    missing_fields = [field for field in required_fields if field not in data or data[field] is None]
+    if missing_fields:
+        return None, f"Faltan campos obligatorios: {', '.join(missing_fields)}."
+
+    # Datos proporcionados por el usuario
+    edad = data['edad']
+    peso = data['peso']
+    altura = data['altura']
+    restricciones = data['restricciones']
+    preferencia = data['preferencia']
+    dias = data['dias']
+
+    # Validar que los valores sean del tipo esperado
+    if not (isinstance(edad, int) and 0 < edad < 120):
+        return None, "La edad debe ser un número entero entre 1 y 120."
+    if not (isinstance(peso, (int, float)) and 0 < peso < 300):
+        return None, "El peso debe ser un número entre 1 y 300."
+    if not (isinstance(altura, (int, float)) and 0 < altura < 250):
+        return None, "La altura debe ser un número entre 1 y 250."
+    if not (isinstance(restricciones, list) and all(isinstance(r, str) for r in restricciones)):
+        return None, "Las restricciones deben ser una lista de cadenas de texto."
+    if not (isinstance(preferencia, str) and preferencia.lower() in ['salado', 'dulce']):
+        return None, "La preferencia debe ser 'salado' o 'dulce'."
+    if not (isinstance(dias, int) and 0 < dias <= 7):
+        return None, "Los días deben ser un número entero entre 1 y 7."
+
+    # Campos opcionales para el modo de composición del plan
+    modo = data.get('modo') or 'aleatorio'
+    genero = data.get('genero')
+    nivel_actividad = data.get('nivel_actividad') or NIVEL_ACTIVIDAD_POR_DEFECTO
+    if modo not in PLAN_MODES:
+        return None, f"El modo debe ser uno de: {', '.join(PLAN_MODES)}."
+    if modo == 'calorias' and not (isinstance(genero, str) and genero.lower() in GENEROS):
+        return None, "El género debe ser 'hombre' o 'mujer' para el modo 'calorias'."
+    if not (isinstance(nivel_actividad, str) and nivel_actividad.lower() in MULTIPLICADORES_ACTIVIDAD):
+        return None, f"El nivel de actividad debe ser uno de: {', '.join(MULTIPLICADORES_ACTIVIDAD)}."
+
+    # Perfil normalizado: el orden de las restricciones no importa y la
+    # preferencia no distingue mayúsculas
+    return {
+        'edad': edad,
+        'peso': peso,
+        'altura': altura,
+        'restricciones': sorted(r.strip() for r in restricciones if r.strip()),
+        'preferencia': preferencia.lower(),
+        'dias': dias,
+        'modo': modo,
+        'genero': genero.lower() if isinstance(genero, str) else None,
+        'nivel_actividad': nivel_actividad.lower()
+    }, None
+
+def calorie_target(profile):
+    """Calorías objetivo por día en el modo 'calorias', o None en el modo aleatorio"""
+    if profile['modo'] != 'calorias':
+        return None
+    return calcular_tdee(profile['peso'], profile['altura'], profile['edad'], profile['genero'], profile['nivel_actividad'])
+
+def profile_rows(profile):
+    """Filas de entrada del modelo para un perfil, una por tipo de comida"""
+    return [
+        {
+            "Edad": profile['edad'],
+            "Peso (kg)": profile['peso'],
+            "Altura (cm)": profile['altura'],
+            "Restricciones Dietéticas": ", ".join(profile['restricciones']),
+            # El modelo se entrenó con las categorías 'Salado' y 'Dulce'
+            "Preferencia": profile['preferencia'].capitalize(),
+            "Tipo de Comida": meal_type
+        }
+        for meal_type in TIPOS_COMIDA
+    ]
+
+def restriction_mask(catalogo, profile):
+    """
+    Máscara de bits de las restricciones del perfil
+
+    Returns:
+        Tupla (máscara, error); error indica las restricciones desconocidas
+    """
+    mask, unknown = catalogo.mascara_restricciones(profile['restricciones'])
+    if unknown:
+        valid_options = ', '.join(catalogo.vocabulario_restricciones + [SIN_RESTRICCION])
+        return None, f"Restricciones no reconocidas: {', '.join(unknown)}. Opciones válidas: {valid_options}."
+    return mask, None
+
+def build_plan(catalogo, predicted_labels, dias, mask=0, mode='aleatorio', target_calories=None):
+    """
+    Armar el plan de varios días a partir de las etiquetas predichas
+
+    Args:
+        catalogo (CatalogoRecetas): Catálogo con el índice por grupo
+        predicted_labels (dict): Etiqueta predicha por tipo de comida
+        dias (int): Número de días del plan
+        mask (int): Máscara de restricciones que deben cumplir todas las recetas
+        mode (str): Modo de composición del plan, uno de PLAN_MODES
+        target_calories (float): Calorías objetivo por día en el modo 'calorias'
+
+    Returns:
+        Tupla (plan, error); plan es el JSON codificado del plan, o None si algún
+        grupo no tiene suficientes recetas
+    """
+    # Elegir de una vez las recetas de todos los días para cada tipo de comida;
+    # las posiciones de un grupo no se repiten, así que no hay platos repetidos
+    selected_positions = {}
+    with metricas.etapa('seleccion'):
+        if mode != 'calorias':
+            chosen = np.empty(0, dtype=np.int64)
+            for meal_type in TIPOS_COMIDA:
+                candidates = catalogo.candidatos(predicted_labels[meal_type], meal_type, mask)
+                if len(candidates) < dias:
+                    return None, f"No hay suficientes recetas únicas para {meal_type}."
+                if mode == 'diverso':
+                    # Se penaliza la similitud con todo lo ya elegido, también de otras comidas
+                    selected_positions[meal_type] = seleccionar_diversas(candidates, catalogo.vectores, dias, chosen)
+                    chosen = np.concatenate([chosen, selected_positions[meal_type]])
+                else:
+                    selected_positions[meal_type] = muestrear_sin_reemplazo(candidates, dias)
+        else:
+            # Una receta por comida y por día con la suma de calorías cerca del objetivo
+            groups = []
+            for meal_type in TIPOS_COMIDA:
+                candidates, calories = catalogo.candidatos_por_calorias(predicted_labels[meal_type], meal_type, mask)
+                if len(candidates) < dias:
+                    return None, f"No hay suficientes recetas únicas para {meal_type}."
+                groups.append((candidates, calories))
+            selection = muestrear_por_calorias(groups, target_calories, CALORIE_TOLERANCE, dias)
+            selected_positions = {meal_type: selection[:, i] for i, meal_type in enumerate(TIPOS_COMIDA)}
+
+    with metricas.etapa('armado'):
+        return assemble_plan(catalogo, selected_positions, dias), None
+
+def assemble_plan(catalogo, selected_positions, dias):
+    """
+    Armar el JSON del plan concatenando los fragmentos precodificados de cada receta
+
+    Returns:
+        bytes con el objeto {"Día N": {tipo de comida: receta}} en UTF-8
+    """
+    days = []
+    for day in range(1, dias + 1):
+        meals = [
+            MEAL_KEYS[meal_type] + b':' + catalogo.fragmento(selected_positions[meal_type][day - 1])
+            for meal_type in TIPOS_COMIDA
+        ]
+        days.append(codificar_json(f"Día {day}") + b':{' + b','.join(meals) + b'}')
+    return b'{' + b','.join(days) + b'}'
+
+def json_response(payload, status=200):
+    """Respuesta JSON a partir de un cuerpo ya codificado"""
+    return Response(payload, status=status, mimetype='application/json')
+
+def saturated_response():
+    """Respuesta 503 cuando el pool de inferencia no puede atender la petición"""
+    response = jsonify({"error": "El servicio de recomendaciones está saturado, intenta de nuevo en unos segundos."})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @recommendations_bp.route('/recommendations', methods=['POST'])
 def get_recommendations():
+    try:
+        with metricas.etapa('validacion'):
+            profile, error = validate_profile(request.get_json())
+        if error:
+            return jsonify({"error": error}), 400
+
+        try:
+            _, catalogo = servicio.recursos()
+        except Exception:
+            return jsonify({"error": "El servicio de recomendaciones no está disponible."}), 503
+
+        # Las recetas elegidas deben cumplir todas las restricciones del usuario
+        mask, error = restriction_mask(catalogo, profile)
+        if error:
+            return jsonify({"error": error}), 400
+
+        # La entrada del modelo solo cambia con el tipo de comida, así que se
+        # predicen las etiquetas de todas las comidas en una sola llamada y se
+        # reutilizan para todos los días del plan
+        try:
+            with metricas.etapa('prediccion'):
+                predicted_labels = dict(zip(TIPOS_COMIDA, servicio.predecir_etiquetas(profile_rows(profile))))
+        except ServicioSaturado:
+            return saturated_response()
+
+        days_recommendations, error = build_plan(
+            catalogo, predicted_labels, profile['dias'], mask, profile['modo'], calorie_target(profile)
+        )
+        if error:
+            return jsonify({"error": error}), 400
+
+        # Retornar el resultado como un JSON
+        with metricas.etapa('serializacion'):
+            return json_response(days_recommendations)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@recommendations_bp.route('/batch', methods=['POST'])
+def get_batch_recommendations():
+    """
+    Generar planes para muchos perfiles en una sola petición
+
+    Espera {"perfiles": [{"id": ..., "edad": ..., ...}, ...]} y devuelve los
+    planes por id de perfil junto con los errores de los perfiles inválidos.
+    Todas las filas perfil × tipo de comida se predicen en una sola llamada.
+    """
     try:
         data = request.get_json()
+        profiles = data.get('perfiles') if isinstance(data, dict) else None
+        if not isinstance(profiles, list) or not profiles:
+            return jsonify({"error": "Se requiere una lista no vacía de perfiles."}), 400
+        if len(profiles) > MAX_BATCH_PROFILES:
+            return jsonify({"error": f"Se permiten como máximo {MAX_BATCH_PROFILES} perfiles por petición."}), 400
 
-        # Validar datos de entrada
-        required_fields = ['edad', 'peso', 'altura', 'restricciones', 'preferencia', 'dias']
-        missing_fields = [field for field in required_fields if field not in data or data[field] is None]
-        if missing_fields:
-            return jsonify({"error": f"Faltan campos obligatorios: {', '.join(missing_fields)}."}), 400
-
-        # Datos proporcionados por el usuario
-        edad = data['edad']
-        peso = data['peso']
-        altura = data['altura']
-        restricciones = data['restricciones']
-        preferencia = data['preferencia']
-        dias = data['dias']
-
-        # Validar que los valores sean del tipo esperado
-        if not (isinstance(edad, int) and 0 < edad < 120):
-            return jsonify({"error": "La edad debe ser un número entero entre 1 y 120."}), 400
-        if not (isinstance(peso, (int, float)) and 0 < peso < 300):
-            return jsonify({"error": "El peso debe ser un número entre 1 y 300."}), 400
-        if not (isinstance(altura, (int, float)) and 0 < altura < 250):
-            return jsonify({"error": "La altura debe ser un número entre 1 y 250."}), 400
-        if not (isinstance(restricciones, list) and all(isinstance(r, str) for r in restricciones)):
-            return jsonify({"error": "Las restricciones deben ser una lista de cadenas de texto."}), 400
-        if preferencia.lower() not in ['salado', 'dulce']:
-            return jsonify({"error": "La preferencia debe ser 'salado' o 'dulce'."}), 400
-        if not (isinstance(dias, int) and 0 < dias <= 7):
-            return jsonify({"error": "Los días deben ser un número entero entre 1 y 7."}), 400
-
-        # Diccionario para organizar recomendaciones por día
-        days_recommendations = {}
-
-        # Guardar las recetas seleccionadas para cada tipo de comida
-        used_recipes = {
-            "Desayuno": set(),
-            "Almuerzo": set(),
-            "Merienda": set()
-        }
+        # Validar todos los perfiles en una sola pasada
+        valid_profiles = {}
+        errors = {}
+        with metricas.etapa('validacion'):
+            for index, raw_profile in enumerate(profiles):
+                # Sin id, con id null o con un id inválido se usa la posición del perfil en la lista
+                raw_id = raw_profile.get('id') if isinstance(raw_profile, dict) else None
+                invalid_id = isinstance(raw_id, bool) or not isinstance(raw_id, (str, int, type(None)))
+                profile_id = str(index if raw_id is None or invalid_id else raw_id)
+                if profile_id in valid_profiles or profile_id in errors:
+                    errors[profile_id] = "El id de perfil está repetido."
+                    valid_profiles.pop(profile_id, None)
+                    continue
+                if invalid_id:
+                    errors[profile_id] = "El id del perfil debe ser un texto o un número entero."
+                    continue
+                profile, error = validate_profile(raw_profile)
+                if error:
+                    errors[profile_id] = error
+                else:
+                    valid_profiles[profile_id] = profile
+
+        plans = {}
+        if valid_profiles:
+            try:
+                _, catalogo = servicio.recursos()
+            except Exception:
+                return jsonify({"error": "El servicio de recomendaciones no está disponible."}), 503
 
-        for day in range(1, dias + 1):
-            daily_plan = {}
-
-            for meal_type in ["Desayuno", "Almuerzo", "Merienda"]:
-                sample_input = {
-                    "Edad": edad,
-                    "Peso (kg)": peso,
-                    "Altura (cm)": altura,
-                    "Restricciones Dietéticas": ", ".join(restricciones),
-                    "Preferencia": preferencia,
-                    "Tipo de Comida": meal_type
-                }
-
-                sample_df = pd.DataFrame([sample_input])
-                predicted_label = model.predict(sample_df)[0]
-
-                # Filtro específico para desayunos
-                if meal_type == "Desayuno":
-                    available_recipes = recipes[
-                        (recipes['Etiqueta de Recomendación'] == predicted_label) &
-                        (recipes['Tipo de Comida'] == meal_type) &
-                        (~recipes['Dish_Title'].isin(used_recipes[meal_type])) &
-                        (recipes['Dish_Title'].str.contains("torta|batido|flan", case=False))
-                    ]
+            masks = {}
+            for profile_id, profile in list(valid_profiles.items()):
+                mask, error = restriction_mask(catalogo, profile)
+                if error:
+                    errors[profile_id] = error
+                    del valid_profiles[profile_id]
                 else:
-                    # Filtro general para almuerzo y merienda
-                    available_recipes = recipes[
-                        (recipes['Etiqueta de Recomendación'] == predicted_label) &
-                        (recipes['Tipo de Comida'] == meal_type) &
-                        (~recipes['Dish_Title'].isin(used_recipes[meal_type]))
-                    ]
-
-                if available_recipes.empty:
-                    return jsonify({"error": f"No hay suficientes recetas únicas para {meal_type}."}), 400
-
-                selected_recipe = available_recipes.sample(1).to_dict(orient='records')[0]
-                used_recipes[meal_type].add(selected_recipe["Dish_Title"])
-
-                # Convertir valores a tipos nativos de Python
-                for key, value in selected_recipe.items():
-                    if isinstance(value, (np.int64, np.float64)):
-                        selected_recipe[key] = value.item()
-
-                # Agregar la receta al plan diario
-                daily_plan[meal_type] = {
-                    "Nombre del Plato": selected_recipe["Dish_Title"],
-                    "Ingredientes": selected_recipe["Recipe_ingredients"],
-                    "Restricciones": selected_recipe["Restricciones Dietéticas"],
-                    "Calorías": selected_recipe["Requerimientos Nutricionales (Calorías)"],
-                    "Tiempo de Preparación": selected_recipe["Tiempo de Preparación"],
-                    "Procedimiento": selected_recipe["Recipe"]
-                }
-
-            # Agregar el plan diario al diccionario final
-            days_recommendations[f"Día {day}"] = daily_plan
+                    masks[profile_id] = mask
 
-        # Retornar el resultado como un JSON
-        return jsonify(days_recommendations)
+            # Una sola predicción para todas las filas perfil × tipo de comida
+            try:
+                with metricas.etapa('prediccion'):
+                    rows = [row for profile in valid_profiles.values() for row in profile_rows(profile)]
+                    labels = servicio.predecir_etiquetas(rows)
+            except ServicioSaturado:
+                return saturated_response()
+
+            for i, (profile_id, profile) in enumerate(valid_profiles.items()):
+                profile_labels = labels[i * len(TIPOS_COMIDA):(i + 1) * len(TIPOS_COMIDA)]
+                plan, error = build_plan(
+                    catalogo, dict(zip(TIPOS_COMIDA, profile_labels)), profile['dias'], masks[profile_id],
+                    profile['modo'], calorie_target(profile)
+                )
+                if error:
+                    errors[profile_id] = error
+                else:
+                    plans[profile_id] = plan
+
+        # Los planes ya vienen codificados; solo se concatenan con sus ids
+        with metricas.etapa('serializacion'):
+            encoded_plans = b','.join(codificar_json(profile_id) + b':' + plan for profile_id, plan in plans.items())
+            return json_response(b'{"planes":{' + encoded_plans + b'},"errores":' + codificar_json(errors) + b'}')
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@recommendations_bp.route('/similar', methods=['GET'])
+def get_similar_recipes():
+    """
+    Recetas parecidas a un plato, para cambiarlo por otro en el plan
+
+    Parámetros: plato (nombre del plato), k (cantidad), tipo (tipo de comida;
+    por defecto el del plato) y restricciones (separadas por comas).
+    """
+    try:
+        title = request.args.get('plato', '').strip()
+        if not title:
+            return jsonify({"error": "Se requiere el nombre del plato."}), 400
+        try:
+            k = int(request.args.get('k', DEFAULT_SIMILAR))
+        except ValueError:
+            k = None
+        if k is None or not 0 < k <= MAX_SIMILAR:
+            return jsonify({"error": f"k debe ser un número entero entre 1 y {MAX_SIMILAR}."}), 400
+        meal_type = request.args.get('tipo')
+        if meal_type is not None and meal_type not in TIPOS_COMIDA:
+            return jsonify({"error": f"El tipo de comida debe ser uno de: {', '.join(TIPOS_COMIDA)}."}), 400
+
+        try:
+            _, catalogo = servicio.recursos()
+        except Exception:
+            return jsonify({"error": "El servicio de recomendaciones no está disponible."}), 503
+
+        position = catalogo.posicion_plato(title)
+        if position is None:
+            return jsonify({"error": "No se encontró el plato."}), 404
+
+        restrictions = [r for r in request.args.get('restricciones', '').split(',') if r.strip()]
+        mask, error = restriction_mask(catalogo, {'restricciones': restrictions})
+        if error:
+            return jsonify({"error": error}), 400
+
+        with metricas.etapa('busqueda'):
+            positions, similarities = catalogo.buscar_similares(
+                position, k, meal_type or catalogo.tipo_comida(position), mask
+            )
+
+        # Cada fragmento ya es un objeto JSON; se le antepone la similitud
+        with metricas.etapa('serializacion'):
+            similar = b','.join(
+                b'{"Similitud":' + codificar_json(round(float(similarity), 4)) + b',' + catalogo.fragmento(p)[1:]
+                for p, similarity in zip(positions, similarities)
+            )
+            return json_response(b'{"plato":' + codificar_json(title) + b',"similares":[' + similar + b']}')
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@recommendations_bp.route('/recommendations/metrics', methods=['GET'])
+def get_metrics():
+    """Percentiles de latencia por etapa acumulados desde el arranque del proceso"""
+    return jsonify({"etapas": metricas.resumen()})
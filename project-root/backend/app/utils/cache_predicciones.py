@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def clave_perfil(fila: dict) -> tuple:
+    """
+    Clave normalizada de una fila de entrada del modelo
+
+    Las restricciones se ordenan y la preferencia se compara sin distinguir
+    mayúsculas, de modo que el mismo perfil siempre produce la misma clave.
+    """
+    restricciones = sorted(r.strip() for r in str(fila["Restricciones Dietéticas"]).split(",") if r.strip())
+    return (
+        int(fila["Edad"]),
+        float(fila["Peso (kg)"]),
+        float(fila["Altura (cm)"]),
+        ", ".join(restricciones),
+        str(fila["Preferencia"]).casefold(),
+        fila["Tipo de Comida"]
+    )
+
+
+class CachePredicciones:
+    """
+    Caché LRU en memoria para las etiquetas predichas por el modelo
+
+    Tiene un límite de entradas y un tiempo de vida por entrada, y lleva la
+    cuenta de aciertos y fallos. Las entradas se asocian a la versión del
+    modelo; al cambiar la versión la caché se vacía.
+    """
+
+    def __init__(self, max_entradas: int = 10000, ttl: float = 3600.0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.version = None
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: tuple):
+        """Etiqueta guardada para la clave, o None si no existe o expiró"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[1] < time.monotonic():
+                if entrada is not None:
+                    del self._entradas[clave]
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[0]
+
+    def guardar(self, clave: tuple, valor):
+        """Guardar una etiqueta y descartar la entrada menos usada si se supera el límite"""
+        with self._lock:
+            self._entradas[clave] = (valor, time.monotonic() + self.ttl)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def asegurar_version(self, version):
+        """Vaciar la caché si las entradas pertenecen a otra versión del modelo"""
+        with self._lock:
+            if version != self.version:
+                self._entradas.clear()
+                self.version = version
+
+    def vaciar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'ttl': self.ttl,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0.0
+            }
@@ -0,0 +1,609 @@
+import hashlib
+import json
+import zlib
+import numpy as np
+import pandas as pd
+
+from .indice_similares import IndiceSimilares
+
+# Tipos de comida que componen un plan diario
+TIPOS_COMIDA = ["Desayuno", "Almuerzo", "Merienda"]
+
+# Solo se sirven como desayuno los platos que contienen alguna de estas palabras
+PALABRAS_CLAVE_DESAYUNO = "torta|batido|flan"
+
+# Columnas que siempre se guardan como códigos + categorías
+COLUMNAS_CATEGORICAS = ['Etiqueta de Recomendación', 'Tipo de Comida']
+
+# Las columnas de texto con pocas variantes también se codifican como categorías
+MAX_CATEGORIAS = 1024
+
+# Valor de "Restricciones Dietéticas" que indica que la receta no cumple ninguna restricción
+SIN_RESTRICCION = "Ninguna"
+
+# Columna con las calorías de cada receta
+COLUMNA_CALORIAS = "Requerimientos Nutricionales (Calorías)"
+
+# Combinaciones aleatorias evaluadas por día al componer un plan por calorías
+INTENTOS_POR_DIA = 512
+
+# Dimensiones del vector de ingredientes (hashing de tokens) de cada receta
+DIMENSIONES_INGREDIENTES = 128
+
+# Columnas numéricas del vector de cada receta y peso del bloque numérico frente al de ingredientes
+COLUMNAS_VECTOR_NUMERICAS = [COLUMNA_CALORIAS, "Tiempo de Preparación"]
+PESO_NUMERICAS = 0.5
+
+# Recetas candidatas evaluadas por MMR y peso de la relevancia frente a la similitud
+TAMANO_POOL_DIVERSIDAD = 256
+PESO_RELEVANCIA = 0.5
+
+# Claves de la respuesta para cada receta y columna del catálogo de donde salen
+CAMPOS_RESPUESTA = {
+    "Nombre del Plato": "Dish_Title",
+    "Ingredientes": "Recipe_ingredients",
+    "Restricciones": "Restricciones Dietéticas",
+    "Calorías": "Requerimientos Nutricionales (Calorías)",
+    "Tiempo de Preparación": "Tiempo de Preparación",
+    "Procedimiento": "Recipe"
+}
+
+
+class ColumnaCategorica:
+    """Columna guardada como códigos enteros más la lista de categorías"""
+
+    def __init__(self, codigos: np.ndarray, categorias: list):
+        self.codigos = codigos
+        self.categorias = list(categorias)
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __getitem__(self, posicion):
+        codigo = self.codigos[posicion]
+        return None if codigo < 0 else self.categorias[codigo]
+
+
+def columnas_desde_dataframe(recipes: pd.DataFrame) -> dict:
+    """
+    Convertir el DataFrame del catálogo en columnas indexables por posición
+
+    Las columnas numéricas quedan como arreglos NumPy, las de pocas variantes
+    como ColumnaCategorica y el texto libre como arreglos de objetos.
+    """
+    columnas = {}
+    for nombre in recipes.columns:
+        serie = recipes[nombre]
+        if nombre in COLUMNAS_CATEGORICAS or (
+            serie.dtype == object and serie.nunique(dropna=True) <= MAX_CATEGORIAS
+        ):
+            codigos, categorias = pd.factorize(serie)
+            columnas[nombre] = ColumnaCategorica(codigos.astype(np.int32), categorias.tolist())
+        elif serie.dtype == object:
+            columnas[nombre] = serie.where(serie.notna(), None).to_numpy()
+        else:
+            columnas[nombre] = serie.to_numpy()
+    return columnas
+
+
+def hash_titulo(titulo) -> np.uint64:
+    """Hash estable de 64 bits de un título (no depende de PYTHONHASHSEED)"""
+    return np.uint64(int.from_bytes(hashlib.blake2b(str(titulo).encode('utf-8'), digest_size=8).digest(), 'little'))
+
+
+def calcular_indice_titulos(titulos, codigos_titulo: np.ndarray) -> dict:
+    """
+    Índice de búsqueda por título: hashes ordenados y posición de la primera receta
+
+    Hay una entrada por título distinto; dos títulos con el mismo hash quedan
+    contiguos y posicion_plato compara el texto para distinguirlos.
+
+    Args:
+        titulos: Títulos indexables por posición
+        codigos_titulo (np.ndarray): Código entero de cada título (-1 para nulos)
+    """
+    codigos_titulo = np.asarray(codigos_titulo)
+    _, primeras = np.unique(codigos_titulo, return_index=True)
+    primeras = primeras[codigos_titulo[primeras] >= 0]
+    hashes = np.fromiter((hash_titulo(titulos[p]) for p in primeras), dtype=np.uint64, count=len(primeras))
+    orden = np.argsort(hashes, kind='stable')
+    return {'hash_titulo': hashes[orden], 'posicion_titulo': primeras[orden].astype(np.int64)}
+
+
+def calcular_derivados(titulos: pd.Series) -> dict:
+    """
+    Calcular las máscaras que dependen del título del plato
+
+    Returns:
+        Diccionario con la máscara de palabras clave del desayuno, un código
+        entero por título y el índice de búsqueda por título
+    """
+    codigos_titulo, _ = pd.factorize(titulos)
+    return {
+        'desayuno': titulos.str.contains(PALABRAS_CLAVE_DESAYUNO, case=False, na=False).to_numpy(),
+        'codigo_titulo': codigos_titulo.astype(np.int64),
+        **calcular_indice_titulos(titulos.to_numpy(), codigos_titulo)
+    }
+
+
+def separar_restricciones(texto) -> list:
+    """Restricciones individuales de un valor como 'Vegetariano, Sin gluten', sin contar 'Ninguna'"""
+    if not isinstance(texto, str):
+        return []
+    return [r.strip() for r in texto.split(",") if r.strip() and r.strip().casefold() != SIN_RESTRICCION.casefold()]
+
+
+def calcular_mascaras_restricciones(columna) -> tuple:
+    """
+    Codificar las restricciones de cada receta como una máscara de bits
+
+    El bit i de la máscara indica que la receta cumple vocabulario[i]. Para
+    columnas categóricas las máscaras se calculan una vez por categoría.
+
+    Args:
+        columna: Columna "Restricciones Dietéticas" (ColumnaCategorica o arreglo)
+
+    Returns:
+        Tupla (np.ndarray uint64 de máscaras por fila, lista con el vocabulario)
+    """
+    valores = columna.categorias if isinstance(columna, ColumnaCategorica) else [columna[i] for i in range(len(columna))]
+    vocabulario = sorted({r for valor in valores for r in separar_restricciones(valor)})
+    if len(vocabulario) > 64:
+        raise ValueError(f"Hay {len(vocabulario)} restricciones distintas; la máscara admite como máximo 64")
+
+    bits = {restriccion: 1 << i for i, restriccion in enumerate(vocabulario)}
+    mascaras = np.array(
+        [sum(bits[r] for r in set(separar_restricciones(valor))) for valor in valores], dtype=np.uint64
+    )
+    if isinstance(columna, ColumnaCategorica):
+        # Los códigos -1 (valor nulo) no cumplen ninguna restricción
+        codigos = np.asarray(columna.codigos)
+        mascaras = np.where(codigos >= 0, mascaras[np.maximum(codigos, 0)] if len(mascaras) else 0, 0)
+    return mascaras.astype(np.uint64), vocabulario
+
+
+def serie_columna(columna) -> pd.Series:
+    """Valores de una columna del catálogo como Series de pandas"""
+    if isinstance(columna, ColumnaCategorica):
+        # El código -1 (nulo) apunta a la última posición, que es None
+        categorias = np.array(list(columna.categorias) + [None], dtype=object)
+        return pd.Series(categorias[np.asarray(columna.codigos)], dtype=object)
+    if isinstance(columna, np.ndarray):
+        return pd.Series(np.asarray(columna))
+    return pd.Series([columna[i] for i in range(len(columna))], dtype=object)
+
+
+def calcular_calorias(columna) -> np.ndarray:
+    """Calorías de cada receta como float64; los valores no numéricos quedan en NaN"""
+    return pd.to_numeric(serie_columna(columna), errors='coerce').to_numpy(np.float64)
+
+
+def tokens_ingredientes(texto) -> list:
+    """Ingredientes de una receta en minúsculas, escritos como 'a, b' o como lista "['a', 'b']" """
+    if not isinstance(texto, str):
+        return []
+    return [token for token in (t.strip(" '\"").lower() for t in texto.strip("[]").split(",")) if token]
+
+
+def calcular_vectores(columnas: dict, n_filas: int) -> np.ndarray:
+    """
+    Vector normalizado de cada receta: ingredientes más columnas numéricas
+
+    Los ingredientes se proyectan con hashing (crc32) a DIMENSIONES_INGREDIENTES
+    posiciones y se normalizan; las columnas numéricas se estandarizan y se
+    ponderan con PESO_NUMERICAS. Cada fila termina con norma 1, así que el
+    producto punto entre dos recetas es su similitud coseno.
+
+    Returns:
+        np.ndarray float32 de forma (n_filas, DIMENSIONES_INGREDIENTES + n_numericas)
+    """
+    ingredientes = np.zeros((n_filas, DIMENSIONES_INGREDIENTES), dtype=np.float32)
+    for fila, texto in enumerate(serie_columna(columnas['Recipe_ingredients'])):
+        for token in tokens_ingredientes(texto):
+            ingredientes[fila, zlib.crc32(token.encode('utf-8')) % DIMENSIONES_INGREDIENTES] += 1.0
+    normas = np.linalg.norm(ingredientes, axis=1, keepdims=True)
+    ingredientes /= np.where(normas > 0, normas, 1.0)
+
+    # Las columnas de texto como "25 minutos" se convierten a su primer número
+    numericas = np.zeros((n_filas, len(COLUMNAS_VECTOR_NUMERICAS)), dtype=np.float32)
+    for k, nombre in enumerate(COLUMNAS_VECTOR_NUMERICAS):
+        if nombre not in columnas:
+            continue
+        serie = serie_columna(columnas[nombre])
+        valores = pd.to_numeric(serie, errors='coerce')
+        if not pd.api.types.is_numeric_dtype(serie):
+            numeros = serie.astype(str).str.extract(r'(\d+(?:[.,]\d+)?)', expand=False).str.replace(',', '.')
+            valores = valores.fillna(pd.to_numeric(numeros, errors='coerce'))
+        valores = valores.to_numpy(np.float64)
+        validos = valores[~np.isnan(valores)]
+        media = validos.mean() if len(validos) else 0.0
+        desviacion = validos.std() if len(validos) else 0.0
+        z = (valores - media) / (desviacion if desviacion > 0 else 1.0)
+        numericas[:, k] = np.nan_to_num(z, nan=0.0) * PESO_NUMERICAS / np.sqrt(len(COLUMNAS_VECTOR_NUMERICAS))
+
+    vectores = np.hstack([ingredientes, numericas])
+    normas = np.linalg.norm(vectores, axis=1, keepdims=True)
+    return (vectores / np.where(normas > 0, normas, 1.0)).astype(np.float32)
+
+
+def codificar_json(valor) -> bytes:
+    """Codificar un valor como JSON compacto en UTF-8"""
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def calcular_fragmentos(columnas: dict, n_filas: int) -> list:
+    """
+    Codificar una sola vez el objeto de respuesta de cada receta
+
+    Returns:
+        Lista con el JSON de cada receta en UTF-8, indexada por posición
+    """
+    fragmentos = []
+    for posicion in range(n_filas):
+        receta = {}
+        for clave, nombre in CAMPOS_RESPUESTA.items():
+            valor = columnas[nombre][posicion]
+            # Convertir valores a tipos nativos de Python; NaN se envía como null
+            if isinstance(valor, np.generic):
+                valor = valor.item()
+            if isinstance(valor, float) and np.isnan(valor):
+                valor = None
+            receta[clave] = valor
+        fragmentos.append(codificar_json(receta))
+    return fragmentos
+
+
+class CatalogoRecetas:
+    """
+    Catálogo de recetas con un índice precalculado por (etiqueta, tipo de comida)
+
+    El índice se construye una sola vez al cargar el dataset, de modo que cada
+    petición solo trabaja sobre las posiciones de su grupo y no recorre el
+    catálogo completo. Las columnas pueden venir de un DataFrame o de un
+    catálogo columnar mapeado en memoria (ver catalogo_columnar.py).
+
+    El JSON de respuesta de cada receta también se codifica al cargar, así que
+    las respuestas se arman concatenando fragmentos ya codificados.
+
+    Las restricciones dietéticas de cada receta se guardan como una máscara de
+    bits sobre un vocabulario, y el filtrado de candidatos es un AND vectorizado.
+
+    Cada receta tiene además un vector normalizado (ver calcular_vectores) para
+    medir similitud entre recetas con productos punto. El índice de similares
+    y el de títulos se reciben ya calculados desde el catálogo columnar; solo
+    se calculan al cargar cuando faltan (CSV o catálogos anteriores).
+    """
+
+    def __init__(self, columnas: dict, n_filas: int, derivados: dict = None, fragmentos=None,
+                 vocabulario_restricciones: list = None, similares: dict = None):
+        self.columnas = columnas
+        self.n_filas = n_filas
+        self.derivados = derivados or {}
+        self.indice = self._construir_indice()
+        self.fragmentos = fragmentos if fragmentos is not None else calcular_fragmentos(columnas, n_filas)
+
+        if 'mascara_restricciones' in self.derivados and vocabulario_restricciones is not None:
+            self.mascaras_restricciones = self.derivados['mascara_restricciones']
+            self.vocabulario_restricciones = list(vocabulario_restricciones)
+        elif n_filas:
+            self.mascaras_restricciones, self.vocabulario_restricciones = calcular_mascaras_restricciones(
+                columnas['Restricciones Dietéticas']
+            )
+        else:
+            self.mascaras_restricciones, self.vocabulario_restricciones = np.empty(0, dtype=np.uint64), []
+        self._bits_restricciones = {
+            restriccion.casefold(): 1 << i for i, restriccion in enumerate(self.vocabulario_restricciones)
+        }
+
+        self.vectores = self.derivados.get('vectores')
+        if self.vectores is None:
+            self.vectores = calcular_vectores(columnas, n_filas) if n_filas else np.empty((0, 0), dtype=np.float32)
+
+        # Cada grupo ordenado por calorías, sin las recetas sin calorías, para
+        # buscar combinaciones con searchsorted
+        self.calorias = calcular_calorias(columnas[COLUMNA_CALORIAS]) if n_filas else np.empty(0)
+        self.indice_calorias = {}
+        for grupo, posiciones in self.indice.items():
+            posiciones = posiciones[~np.isnan(self.calorias[posiciones])]
+            self.indice_calorias[grupo] = posiciones[np.argsort(self.calorias[posiciones], kind='stable')]
+
+        # Índice de recetas similares e índice de títulos para las consultas por nombre
+        self.similares = None
+        if n_filas:
+            if similares is not None:
+                self.similares = IndiceSimilares(self.vectores, self.derivados['codigo_titulo'], similares)
+            else:
+                self.similares = IndiceSimilares.ajustar(
+                    self.vectores, self._posiciones_por_tipo(), self.mascaras_restricciones,
+                    self.derivados['codigo_titulo']
+                )
+            if 'hash_titulo' not in self.derivados:
+                self.derivados.update(calcular_indice_titulos(columnas['Dish_Title'], self.derivados['codigo_titulo']))
+
+    @classmethod
+    def desde_dataframe(cls, recipes: pd.DataFrame) -> 'CatalogoRecetas':
+        """Construir el catálogo a partir del DataFrame leído del CSV"""
+        if recipes.empty:
+            return cls({}, 0)
+        return cls(
+            columnas_desde_dataframe(recipes),
+            len(recipes),
+            calcular_derivados(recipes['Dish_Title'])
+        )
+
+    def __len__(self):
+        return self.n_filas
+
+    def _construir_indice(self) -> dict:
+        """
+        Agrupar las posiciones de fila por (etiqueta, tipo de comida)
+
+        Cada grupo contiene una sola posición por título, así que muestrear
+        posiciones distintas equivale a no repetir platos dentro del plan.
+
+        Returns:
+            Diccionario {(etiqueta, tipo de comida): np.ndarray de posiciones}
+        """
+        if self.n_filas == 0:
+            return {}
+
+        etiquetas = self.columnas['Etiqueta de Recomendación']
+        tipos = self.columnas['Tipo de Comida']
+        mascara_desayuno = self.derivados['desayuno']
+        codigos_titulo = self.derivados['codigo_titulo']
+
+        # Clave combinada por fila; un orden estable conserva el orden del catálogo
+        clave = etiquetas.codigos.astype(np.int64) * len(tipos.categorias) + tipos.codigos
+        validas = (etiquetas.codigos >= 0) & (tipos.codigos >= 0)
+        posiciones_validas = np.flatnonzero(validas)
+        orden = posiciones_validas[np.argsort(clave[validas], kind='stable')]
+        claves, inicios = np.unique(clave[orden], return_index=True)
+
+        indice = {}
+        for clave_grupo, posiciones in zip(claves, np.split(orden, inicios[1:])):
+            etiqueta = etiquetas.categorias[clave_grupo // len(tipos.categorias)]
+            tipo_comida = tipos.categorias[clave_grupo % len(tipos.categorias)]
+            if tipo_comida == "Desayuno":
+                posiciones = posiciones[mascara_desayuno[posiciones]]
+            _, primeras = np.unique(codigos_titulo[posiciones], return_index=True)
+            posiciones = posiciones[np.sort(primeras)]
+            indice[(etiqueta, tipo_comida)] = posiciones.astype(np.int64)
+        return indice
+
+    def _posiciones_por_tipo(self) -> dict:
+        """Posiciones servibles en cada tipo de comida, de cualquier etiqueta y sin títulos repetidos"""
+        por_tipo = {}
+        for (_, tipo_comida), posiciones in self.indice.items():
+            por_tipo.setdefault(tipo_comida, []).append(posiciones)
+
+        codigos_titulo = self.derivados['codigo_titulo']
+        resultado = {}
+        for tipo_comida, grupos in por_tipo.items():
+            posiciones = np.sort(np.concatenate(grupos))
+            _, primeras = np.unique(codigos_titulo[posiciones], return_index=True)
+            resultado[tipo_comida] = posiciones[np.sort(primeras)]
+        return resultado
+
+    def mascara_restricciones(self, restricciones: list) -> tuple:
+        """
+        Máscara de bits de las restricciones pedidas por el usuario
+
+        La comparación no distingue mayúsculas y "Ninguna" se ignora.
+
+        Returns:
+            Tupla (máscara, lista de restricciones que no están en el vocabulario)
+        """
+        mascara = 0
+        desconocidas = []
+        for restriccion in restricciones:
+            for r in separar_restricciones(restriccion):
+                bit = self._bits_restricciones.get(r.casefold())
+                if bit is None:
+                    desconocidas.append(r)
+                else:
+                    mascara |= bit
+        return mascara, desconocidas
+
+    def candidatos(self, etiqueta, tipo_comida: str, mascara: int = 0) -> np.ndarray:
+        """
+        Posiciones de las recetas que corresponden a la etiqueta y tipo de comida
+
+        Con una máscara distinta de cero solo quedan las recetas que cumplen
+        todas las restricciones de la máscara.
+        """
+        posiciones = self.indice.get((etiqueta, tipo_comida), np.empty(0, dtype=np.int64))
+        if mascara:
+            mascara = np.uint64(mascara)
+            posiciones = posiciones[(self.mascaras_restricciones[posiciones] & mascara) == mascara]
+        return posiciones
+
+    def candidatos_por_calorias(self, etiqueta, tipo_comida: str, mascara: int = 0) -> tuple:
+        """
+        Candidatos del grupo ordenados por calorías, filtrados por la máscara
+
+        Returns:
+            Tupla (posiciones, calorías) con las calorías en orden ascendente
+        """
+        posiciones = self.indice_calorias.get((etiqueta, tipo_comida), np.empty(0, dtype=np.int64))
+        if mascara:
+            mascara = np.uint64(mascara)
+            posiciones = posiciones[(self.mascaras_restricciones[posiciones] & mascara) == mascara]
+        return posiciones, self.calorias[posiciones]
+
+    def registro(self, posicion: int) -> dict:
+        """Valores de todas las columnas para la receta en la posición indicada"""
+        return {nombre: columna[posicion] for nombre, columna in self.columnas.items()}
+
+    def fragmento(self, posicion: int) -> bytes:
+        """JSON de respuesta ya codificado de la receta en la posición indicada"""
+        return self.fragmentos[posicion]
+
+    def posicion_plato(self, titulo: str):
+        """Posición de la primera receta con el título indicado, o None si no existe"""
+        hashes = self.derivados.get('hash_titulo')
+        if hashes is None:
+            return None
+        valor = hash_titulo(titulo)
+        inicio, fin = np.searchsorted(hashes, valor, side='left'), np.searchsorted(hashes, valor, side='right')
+        for posicion in self.derivados['posicion_titulo'][inicio:fin]:
+            if self.columnas['Dish_Title'][posicion] == titulo:
+                return int(posicion)
+        return None
+
+    def tipo_comida(self, posicion: int) -> str:
+        return self.columnas['Tipo de Comida'][posicion]
+
+    def buscar_similares(self, posicion: int, k: int, tipo_comida: str, mascara: int = 0) -> tuple:
+        """
+        Las k recetas más parecidas a una receta, servibles en el tipo de comida indicado
+
+        Returns:
+            Tupla (posiciones, similitudes) de mayor a menor similitud
+        """
+        if self.similares is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return self.similares.buscar(posicion, k, tipo_comida, mascara)
+
+
+def muestrear_sin_reemplazo(posiciones: np.ndarray, k: int, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Elegir k posiciones distintas de un grupo en una sola operación
+
+    Args:
+        posiciones (np.ndarray): Posiciones candidatas del grupo
+        k (int): Número de posiciones a elegir
+        rng (np.random.Generator): Generador aleatorio; si no se indica se crea uno nuevo
+
+    Returns:
+        np.ndarray con k posiciones sin repetir
+
+    Raises:
+        ValueError: Si el grupo tiene menos de k posiciones
+    """
+    if k > len(posiciones):
+        raise ValueError(f"Se pidieron {k} recetas pero el grupo solo tiene {len(posiciones)}")
+    rng = rng or np.random.default_rng()
+    return posiciones[rng.choice(len(posiciones), size=k, replace=False)]
+
+
+def seleccionar_diversas(posiciones: np.ndarray, vectores: np.ndarray, k: int, elegidas: np.ndarray = None,
+                         rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Elegir k posiciones con relevancia marginal máxima (MMR)
+
+    Se toma al azar un pool de hasta TAMANO_POOL_DIVERSIDAD candidatos con una
+    relevancia aleatoria, y en cada paso se elige el que maximiza
+    PESO_RELEVANCIA * relevancia - (1 - PESO_RELEVANCIA) * similitud máxima con
+    las recetas ya elegidas. La similitud se actualiza con un solo producto
+    matriz-vector por paso.
+
+    Args:
+        posiciones (np.ndarray): Posiciones candidatas del grupo
+        vectores (np.ndarray): Vectores normalizados de todo el catálogo
+        k (int): Número de posiciones a elegir
+        elegidas (np.ndarray): Posiciones ya elegidas en el plan (por ejemplo, de otras comidas)
+        rng (np.random.Generator): Generador aleatorio; si no se indica se crea uno nuevo
+
+    Returns:
+        np.ndarray con k posiciones sin repetir
+
+    Raises:
+        ValueError: Si el grupo tiene menos de k posiciones
+    """
+    if k > len(posiciones):
+        raise ValueError(f"Se pidieron {k} recetas pero el grupo solo tiene {len(posiciones)}")
+    rng = rng or np.random.default_rng()
+
+    if len(posiciones) > TAMANO_POOL_DIVERSIDAD:
+        pool = posiciones[rng.choice(len(posiciones), size=TAMANO_POOL_DIVERSIDAD, replace=False)]
+    else:
+        pool = np.asarray(posiciones)
+    X = np.asarray(vectores[pool])
+    relevancia = rng.random(len(pool)).astype(np.float32)
+
+    similitud = np.zeros(len(pool), dtype=np.float32)
+    if elegidas is not None and len(elegidas):
+        similitud = (X @ np.asarray(vectores[elegidas]).T).max(axis=1)
+
+    disponibles = np.ones(len(pool), dtype=bool)
+    resultado = np.empty(k, dtype=np.int64)
+    for paso in range(k):
+        puntaje = PESO_RELEVANCIA * relevancia - (1 - PESO_RELEVANCIA) * similitud
+        puntaje[~disponibles] = -np.inf
+        mejor = int(np.argmax(puntaje))
+        resultado[paso] = pool[mejor]
+        disponibles[mejor] = False
+        similitud = np.maximum(similitud, X @ X[mejor])
+    return resultado
+
+
+def muestrear_por_calorias(grupos: list, objetivo: float, tolerancia: float, dias: int,
+                           rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Elegir una receta por grupo y por día de modo que la suma de calorías del
+    día quede dentro de objetivo ± tolerancia
+
+    Por cada día se sortean INTENTOS_POR_DIA combinaciones de los primeros
+    grupos y, para cada una, se busca con searchsorted el rango de calorías del
+    último grupo que completa el objetivo. Se elige al azar una combinación con
+    rango no vacío y una receta dentro del rango; si ninguna entra en la
+    tolerancia se usa la combinación más cercana al objetivo. Las recetas no se
+    repiten entre días.
+
+    Args:
+        grupos (list): Lista de tuplas (posiciones, calorías) ordenadas por calorías, una por tipo de comida
+        objetivo (float): Calorías objetivo por día
+        tolerancia (float): Desviación relativa permitida, por ejemplo 0.1
+        dias (int): Número de días del plan
+        rng (np.random.Generator): Generador aleatorio; si no se indica se crea uno nuevo
+
+    Returns:
+        np.ndarray de forma (dias, n_grupos) con las posiciones elegidas
+
+    Raises:
+        ValueError: Si algún grupo tiene menos de dias recetas
+    """
+    for posiciones, _ in grupos:
+        if dias > len(posiciones):
+            raise ValueError(f"Se pidieron {dias} recetas pero el grupo solo tiene {len(posiciones)}")
+    rng = rng or np.random.default_rng()
+
+    minimo, maximo = objetivo * (1 - tolerancia), objetivo * (1 + tolerancia)
+    usados = [np.zeros(len(posiciones), dtype=bool) for posiciones, _ in grupos]
+    seleccion = np.empty((dias, len(grupos)), dtype=np.int64)
+
+    for dia in range(dias):
+        # Índices al azar entre las recetas no usadas de los primeros grupos
+        indices = []
+        suma = np.zeros(INTENTOS_POR_DIA, dtype=np.float64)
+        for (_, calorias), usado in zip(grupos[:-1], usados[:-1]):
+            libres = np.flatnonzero(~usado)
+            elegidos = libres[rng.integers(len(libres), size=INTENTOS_POR_DIA)]
+            indices.append(elegidos)
+            suma += calorias[elegidos]
+
+        # Recetas libres del último grupo; siguen ordenadas por calorías
+        libres_ultimo = np.flatnonzero(~usados[-1])
+        calorias_ultimo = grupos[-1][1][libres_ultimo]
+        inicio = np.searchsorted(calorias_ultimo, minimo - suma, side='left')
+        fin = np.searchsorted(calorias_ultimo, maximo - suma, side='right')
+        factibles = np.flatnonzero(fin > inicio)
+
+        if len(factibles):
+            intento = rng.choice(factibles)
+            elegido_ultimo = rng.integers(inicio[intento], fin[intento])
+        else:
+            # La receta del último grupo más cercana a lo que falta en cada combinación
+            faltante = objetivo - suma
+            derecha = np.clip(np.searchsorted(calorias_ultimo, faltante), 0, len(calorias_ultimo) - 1)
+            izquierda = np.clip(derecha - 1, 0, len(calorias_ultimo) - 1)
+            usar_izquierda = np.abs(calorias_ultimo[izquierda] - faltante) < np.abs(calorias_ultimo[derecha] - faltante)
+            cercanos = np.where(usar_izquierda, izquierda, derecha)
+            intento = int(np.argmin(np.abs(calorias_ultimo[cercanos] - faltante)))
+            elegido_ultimo = cercanos[intento]
+
+        elegidos = [indice[intento] for indice in indices] + [libres_ultimo[elegido_ultimo]]
+        for g, (elegido, usado) in enumerate(zip(elegidos, usados)):
+            usado[elegido] = True
+            seleccion[dia, g] = grupos[g][0][elegido]
+    return seleccion
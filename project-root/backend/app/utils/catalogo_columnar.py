@@ -0,0 +1,192 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+from .catalogo import (
+    CatalogoRecetas, ColumnaCategorica, columnas_desde_dataframe, calcular_derivados, calcular_fragmentos,
+    calcular_mascaras_restricciones, calcular_vectores
+)
+from .indice_similares import ARREGLOS_BLOQUE
+
+# Versión del formato columnar del catálogo
+VERSION_CATALOGO = 1
+
+ARCHIVO_ESQUEMA = 'esquema.json'
+
+
+class ColumnaTexto:
+    """
+    Columna de texto guardada como un bloque UTF-8 más un arreglo de offsets
+
+    El texto de la fila i ocupa datos[offsets[i]:offsets[i + 1]]. Las filas
+    nulas se marcan en un arreglo booleano aparte. Con binaria=True cada fila
+    se devuelve como bytes sin decodificar.
+    """
+
+    def __init__(self, offsets: np.ndarray, datos: np.ndarray, nulos: np.ndarray = None, binaria: bool = False):
+        self.offsets = offsets
+        self.datos = datos
+        self.nulos = nulos
+        self.binaria = binaria
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, posicion):
+        if self.nulos is not None and self.nulos[posicion]:
+            return None
+        inicio, fin = self.offsets[posicion], self.offsets[posicion + 1]
+        texto = self.datos[inicio:fin].tobytes()
+        return texto if self.binaria else texto.decode('utf-8')
+
+
+def _codificar_textos(valores) -> tuple:
+    """Concatenar textos (o bytes ya codificados) en un bloque UTF-8 y calcular sus offsets"""
+    codificados = [
+        b'' if valor is None else valor if isinstance(valor, bytes) else str(valor).encode('utf-8')
+        for valor in valores
+    ]
+    offsets = np.zeros(len(codificados) + 1, dtype=np.int64)
+    np.cumsum([len(texto) for texto in codificados], out=offsets[1:])
+    datos = np.frombuffer(b''.join(codificados), dtype=np.uint8)
+    nulos = np.array([valor is None for valor in valores], dtype=bool)
+    return offsets, datos, nulos
+
+
+def _valor_nativo(valor):
+    """Convertir escalares de NumPy a tipos nativos para guardarlos en JSON"""
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def construir_catalogo_columnar(ruta_csv: str, directorio: str):
+    """
+    Convertir el CSV del catálogo en un formato columnar listo para mmap
+
+    Cada columna numérica se guarda como un .npy, las categóricas como códigos
+    más la lista de categorías en el esquema, y el texto libre como un bloque
+    UTF-8 con offsets. También se guardan las máscaras derivadas del título,
+    el índice de búsqueda por título, el JSON de respuesta de cada receta, las
+    máscaras de restricciones con su vocabulario, la matriz de vectores de
+    recetas y el índice de similares (proyección PCA y bloques proyectados por
+    tipo de comida) para no recalcularlos al arrancar.
+
+    Args:
+        ruta_csv (str): Ruta a final_recipes.csv
+        directorio (str): Directorio de salida
+    """
+    recipes = pd.read_csv(ruta_csv)
+    os.makedirs(directorio, exist_ok=True)
+
+    esquema = {'version': VERSION_CATALOGO, 'n_filas': len(recipes), 'columnas': [], 'derivados': []}
+
+    columnas = columnas_desde_dataframe(recipes)
+    for i, (nombre, columna) in enumerate(columnas.items()):
+        base = f'col{i}'
+        if isinstance(columna, ColumnaCategorica):
+            np.save(os.path.join(directorio, f'{base}.codigos.npy'), columna.codigos)
+            esquema['columnas'].append({
+                'nombre': nombre, 'tipo': 'categorico', 'archivo': base,
+                'categorias': [_valor_nativo(valor) for valor in columna.categorias]
+            })
+        elif columna.dtype == object:
+            offsets, datos, nulos = _codificar_textos(columna)
+            np.save(os.path.join(directorio, f'{base}.offsets.npy'), offsets)
+            np.save(os.path.join(directorio, f'{base}.datos.npy'), datos)
+            np.save(os.path.join(directorio, f'{base}.nulos.npy'), nulos)
+            esquema['columnas'].append({'nombre': nombre, 'tipo': 'texto', 'archivo': base})
+        else:
+            np.save(os.path.join(directorio, f'{base}.npy'), columna)
+            esquema['columnas'].append({'nombre': nombre, 'tipo': 'numerico', 'archivo': base})
+
+    if len(recipes):
+        derivados = calcular_derivados(recipes['Dish_Title'])
+        derivados['mascara_restricciones'], vocabulario = calcular_mascaras_restricciones(
+            columnas['Restricciones Dietéticas']
+        )
+        derivados['vectores'] = calcular_vectores(columnas, len(recipes))
+        for nombre, arreglo in derivados.items():
+            np.save(os.path.join(directorio, f'derivado_{nombre}.npy'), arreglo)
+            esquema['derivados'].append(nombre)
+        esquema['vocabulario_restricciones'] = vocabulario
+
+        fragmentos = calcular_fragmentos(columnas, len(recipes))
+        offsets, datos, _ = _codificar_textos(fragmentos)
+        np.save(os.path.join(directorio, 'fragmentos.offsets.npy'), offsets)
+        np.save(os.path.join(directorio, 'fragmentos.datos.npy'), datos)
+        esquema['fragmentos'] = 'fragmentos'
+
+        # El índice de similares depende de los grupos del catálogo, así que se arma el catálogo en memoria
+        similares = CatalogoRecetas(columnas, len(recipes), derivados, fragmentos, vocabulario).similares
+        np.save(os.path.join(directorio, 'similares_media.npy'), similares.media)
+        np.save(os.path.join(directorio, 'similares_proyeccion.npy'), similares.proyeccion)
+        bloques = []
+        for i, (tipo_comida, bloque) in enumerate(similares.bloques.items()):
+            base = f'similares_{i}'
+            for nombre in ARREGLOS_BLOQUE:
+                np.save(os.path.join(directorio, f'{base}.{nombre}.npy'), bloque[nombre])
+            bloques.append({'tipo_comida': _valor_nativo(tipo_comida), 'archivo': base})
+        esquema['similares'] = {'media': 'similares_media', 'proyeccion': 'similares_proyeccion', 'bloques': bloques}
+
+    # El esquema se escribe al final para que un directorio a medio construir no se cargue
+    with open(os.path.join(directorio, ARCHIVO_ESQUEMA), 'w', encoding='utf-8') as archivo:
+        json.dump(esquema, archivo, ensure_ascii=False, indent=2)
+
+    print(f"Catálogo columnar guardado en {directorio} ({len(recipes)} recetas)")
+
+
+def cargar_catalogo_columnar(directorio: str) -> CatalogoRecetas:
+    """
+    Cargar el catálogo columnar en modo solo lectura con memoria mapeada
+
+    Los arreglos se comparten entre procesos a través de la caché de páginas
+    del sistema operativo, así que cada worker no guarda su propia copia.
+    """
+    with open(os.path.join(directorio, ARCHIVO_ESQUEMA), encoding='utf-8') as archivo:
+        esquema = json.load(archivo)
+    if esquema.get('version') != VERSION_CATALOGO:
+        raise ValueError(f"Versión de catálogo no soportada: {esquema.get('version')}")
+
+    def mapear(nombre_archivo):
+        return np.load(os.path.join(directorio, nombre_archivo), mmap_mode='r')
+
+    columnas = {}
+    for columna in esquema['columnas']:
+        base = columna['archivo']
+        if columna['tipo'] == 'categorico':
+            columnas[columna['nombre']] = ColumnaCategorica(mapear(f'{base}.codigos.npy'), columna['categorias'])
+        elif columna['tipo'] == 'texto':
+            columnas[columna['nombre']] = ColumnaTexto(
+                mapear(f'{base}.offsets.npy'), mapear(f'{base}.datos.npy'), mapear(f'{base}.nulos.npy')
+            )
+        else:
+            columnas[columna['nombre']] = mapear(f'{base}.npy')
+
+    derivados = {nombre: mapear(f'derivado_{nombre}.npy') for nombre in esquema['derivados']}
+
+    # Los catálogos construidos antes de guardar los fragmentos o el índice de similares los calculan al cargar
+    fragmentos = None
+    if esquema.get('fragmentos'):
+        base = esquema['fragmentos']
+        fragmentos = ColumnaTexto(mapear(f'{base}.offsets.npy'), mapear(f'{base}.datos.npy'), binaria=True)
+
+    similares = None
+    if esquema.get('similares'):
+        indice = esquema['similares']
+        similares = {
+            'media': mapear(f"{indice['media']}.npy"),
+            'proyeccion': mapear(f"{indice['proyeccion']}.npy"),
+            'bloques': {
+                bloque['tipo_comida']: {nombre: mapear(f"{bloque['archivo']}.{nombre}.npy") for nombre in ARREGLOS_BLOQUE}
+                for bloque in indice['bloques']
+            }
+        }
+    return CatalogoRecetas(
+        columnas, esquema['n_filas'], derivados, fragmentos, esquema.get('vocabulario_restricciones'), similares
+    )
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.utils.catalogo_columnar <final_recipes.csv> <directorio_salida>
+    construir_catalogo_columnar(sys.argv[1], sys.argv[2])
@@ -0,0 +1,145 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as TiempoAgotado
+from concurrent.futures.process import BrokenProcessPool
+
+# Modelo cargado en cada proceso worker y artefacto del que proviene
+_modelo_worker = None
+_artefacto_worker = None
+
+
+class ServicioSaturado(Exception):
+    """La inferencia no se pudo atender: cola llena, tiempo agotado o pool caído"""
+
+
+def _asegurar_modelo(cargar, artefacto):
+    """Cargar el modelo del worker si aún no está cargado o si el artefacto cambió"""
+    global _modelo_worker, _artefacto_worker
+    if _artefacto_worker != artefacto:
+        _modelo_worker = cargar(*artefacto[:2])
+        _artefacto_worker = artefacto
+    return _modelo_worker
+
+
+def _inicializar_worker(cargar, artefacto):
+    _asegurar_modelo(cargar, artefacto)
+
+
+def _predecir_en_worker(cargar, predecir, artefacto, filas):
+    return predecir(_asegurar_modelo(cargar, artefacto), filas)
+
+
+class EjecutorInferencia:
+    """
+    Pool de procesos para la inferencia del modelo
+
+    Cada worker carga el modelo una sola vez al arrancar y solo lo recarga si
+    el artefacto activo cambia. Las peticiones en vuelo se limitan con un
+    semáforo: si la cola está llena se rechazan de inmediato con
+    ServicioSaturado en lugar de esperar, y lo mismo si la predicción supera
+    el tiempo máximo.
+
+    Args:
+        cargar (callable): Función cargar(ruta, tipo) -> modelo, importable desde el worker
+        predecir (callable): Función predecir(modelo, filas) -> etiquetas, importable desde el worker
+        n_procesos (int): Número de procesos worker
+        max_pendientes (int): Máximo de predicciones en vuelo o en cola
+        timeout (float): Segundos máximos de espera por predicción
+    """
+
+    def __init__(self, cargar, predecir, n_procesos: int, max_pendientes: int, timeout: float):
+        self.cargar = cargar
+        self.predecir_con = predecir
+        self.n_procesos = n_procesos
+        self.max_pendientes = max_pendientes
+        self.timeout = timeout
+        self.rechazadas = 0
+        self.tiempos_agotados = 0
+        self._cupos = threading.BoundedSemaphore(max_pendientes)
+        self._pendientes = 0
+        self._pool = None
+        self._artefacto = None
+        self._lock = threading.Lock()
+
+    def iniciar(self, artefacto: tuple):
+        """
+        Arrancar el pool con el artefacto activo
+
+        Args:
+            artefacto (tuple): (ruta, tipo, firma) del modelo que deben cargar los workers
+        """
+        with self._lock:
+            self._artefacto = artefacto
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.n_procesos,
+                    initializer=_inicializar_worker,
+                    initargs=(self.cargar, artefacto)
+                )
+
+    def _liberar(self, _futuro):
+        with self._lock:
+            self._pendientes -= 1
+        self._cupos.release()
+
+    def predecir(self, filas: list, artefacto: tuple = None):
+        """
+        Predecir en un worker y esperar el resultado
+
+        Raises:
+            ServicioSaturado: Si no hay cupo en la cola, se agota el tiempo o el pool se cayó
+        """
+        if self._pool is None:
+            raise ServicioSaturado("El pool de inferencia no está iniciado.")
+        if not self._cupos.acquire(blocking=False):
+            self.rechazadas += 1
+            raise ServicioSaturado("La cola de inferencia está llena.")
+
+        try:
+            futuro = self._pool.submit(
+                _predecir_en_worker, self.cargar, self.predecir_con, artefacto or self._artefacto, filas
+            )
+        except BrokenProcessPool:
+            self._cupos.release()
+            self._reiniciar()
+            raise ServicioSaturado("El pool de inferencia se reinició.")
+        except Exception:
+            self._cupos.release()
+            raise
+
+        with self._lock:
+            self._pendientes += 1
+        futuro.add_done_callback(self._liberar)
+
+        try:
+            return futuro.result(timeout=self.timeout)
+        except TiempoAgotado:
+            futuro.cancel()
+            self.tiempos_agotados += 1
+            raise ServicioSaturado("La inferencia superó el tiempo máximo.")
+        except BrokenProcessPool:
+            self._reiniciar()
+            raise ServicioSaturado("El pool de inferencia se reinició.")
+
+    def _reiniciar(self):
+        """Descartar un pool caído y crear uno nuevo con el último artefacto"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.iniciar(self._artefacto)
+
+    def cerrar(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def estadisticas(self) -> dict:
+        return {
+            'procesos': self.n_procesos,
+            'max_pendientes': self.max_pendientes,
+            'timeout': self.timeout,
+            'pendientes': self._pendientes,
+            'rechazadas': self.rechazadas,
+            'tiempos_agotados': self.tiempos_agotados
+        }
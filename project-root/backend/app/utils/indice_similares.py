@@ -0,0 +1,126 @@
+import numpy as np
+
+# Dimensiones de la proyección usada para la búsqueda gruesa
+DIMENSIONES_INDICE = 32
+
+# Filas usadas para ajustar la proyección (PCA)
+MUESTRA_PROYECCION = 20000
+
+# Candidatos de la búsqueda gruesa que se reordenan con los vectores completos
+CANDIDATOS_REORDENAR = 64
+
+# Arreglos de cada bloque por tipo de comida
+ARREGLOS_BLOQUE = ('posiciones', 'matriz', 'normas', 'mascaras', 'codigos_titulo')
+
+
+def ajustar_indice(vectores: np.ndarray, grupos: dict, mascaras: np.ndarray, codigos_titulo: np.ndarray,
+                   semilla: int = 0) -> dict:
+    """
+    Calcular los arreglos del índice de similares
+
+    La proyección PCA se ajusta sobre una muestra de hasta MUESTRA_PROYECCION
+    filas y cada bloque guarda, por tipo de comida, las posiciones elegibles
+    con sus vectores proyectados, normas, máscaras de restricciones y códigos
+    de título. El catálogo columnar los guarda al construirse para no
+    calcularlos al arrancar (ver catalogo_columnar.py).
+
+    Args:
+        vectores (np.ndarray): Vectores normalizados de todo el catálogo
+        grupos (dict): Posiciones elegibles por tipo de comida
+        mascaras (np.ndarray): Máscara de restricciones de cada receta
+        codigos_titulo (np.ndarray): Código entero del título de cada receta
+
+    Returns:
+        Diccionario {'media', 'proyeccion', 'bloques': {tipo de comida: arreglos del bloque}}
+    """
+    vectores = np.asarray(vectores)
+    rng = np.random.default_rng(semilla)
+    muestra = vectores[np.sort(rng.choice(len(vectores), size=min(len(vectores), MUESTRA_PROYECCION), replace=False))]
+    media = muestra.mean(axis=0)
+    _, _, componentes = np.linalg.svd(muestra - media, full_matrices=False)
+    media = media.astype(np.float32)
+    proyeccion = componentes[:DIMENSIONES_INDICE].T.astype(np.float32)
+
+    bloques = {}
+    for tipo_comida, posiciones in grupos.items():
+        reducidos = np.ascontiguousarray((vectores[posiciones] - media) @ proyeccion)
+        bloques[tipo_comida] = {
+            'posiciones': np.asarray(posiciones, dtype=np.int64),
+            'matriz': reducidos,
+            'normas': np.einsum('ij,ij->i', reducidos, reducidos),
+            'mascaras': np.asarray(mascaras[posiciones]),
+            'codigos_titulo': np.asarray(codigos_titulo[posiciones])
+        }
+    return {'media': media, 'proyeccion': proyeccion, 'bloques': bloques}
+
+
+class IndiceSimilares:
+    """
+    Índice de vecinos más cercanos sobre los vectores de recetas
+
+    Para cada tipo de comida guarda un bloque contiguo con las recetas que se
+    pueden servir en esa comida, proyectadas con PCA a DIMENSIONES_INDICE
+    dimensiones. Una consulta es un producto matriz-vector sobre el bloque,
+    argpartition para quedarse con CANDIDATOS_REORDENAR candidatos y un
+    reordenamiento exacto por similitud coseno con los vectores completos.
+
+    Los arreglos del índice (ver ajustar_indice) pueden venir mapeados en
+    memoria desde el catálogo columnar; solo se leen las páginas que toca
+    cada consulta.
+
+    Args:
+        vectores (np.ndarray): Vectores normalizados de todo el catálogo
+        codigos_titulo (np.ndarray): Código entero del título de cada receta
+        arreglos (dict): Media, proyección y bloques calculados con ajustar_indice
+    """
+
+    def __init__(self, vectores: np.ndarray, codigos_titulo: np.ndarray, arreglos: dict):
+        self.vectores = vectores
+        self.codigos_titulo = codigos_titulo
+        self.media = arreglos['media']
+        self.proyeccion = arreglos['proyeccion']
+        self.bloques = arreglos['bloques']
+
+    @classmethod
+    def ajustar(cls, vectores: np.ndarray, grupos: dict, mascaras: np.ndarray, codigos_titulo: np.ndarray,
+                semilla: int = 0) -> 'IndiceSimilares':
+        """Ajustar la proyección y construir los bloques a partir de los vectores"""
+        return cls(vectores, codigos_titulo, ajustar_indice(vectores, grupos, mascaras, codigos_titulo, semilla))
+
+    def proyectar(self, vectores: np.ndarray) -> np.ndarray:
+        return (vectores - self.media) @ self.proyeccion
+
+    def buscar(self, posicion: int, k: int, tipo_comida: str, mascara: int = 0) -> tuple:
+        """
+        Las k recetas más parecidas a la de la posición indicada
+
+        Se excluyen las recetas con el mismo título y, con una máscara distinta
+        de cero, las que no cumplen todas sus restricciones.
+
+        Returns:
+            Tupla (posiciones, similitudes) ordenadas de mayor a menor similitud
+        """
+        bloque = self.bloques.get(tipo_comida)
+        if bloque is None or not len(bloque['posiciones']) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Menor distancia euclídea en el espacio proyectado = mayor 2 q·x - |x|²
+        consulta = self.proyectar(np.asarray(self.vectores[posicion]))
+        puntajes = 2.0 * (bloque['matriz'] @ consulta) - bloque['normas']
+        excluidas = bloque['codigos_titulo'] == self.codigos_titulo[posicion]
+        if mascara:
+            mascara = np.uint64(mascara)
+            excluidas |= (bloque['mascaras'] & mascara) != mascara
+        puntajes[excluidas] = -np.inf
+
+        n_validas = len(puntajes) - int(excluidas.sum())
+        n_candidatos = min(max(CANDIDATOS_REORDENAR, k), n_validas)
+        if n_candidatos <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        candidatos = np.argpartition(-puntajes, n_candidatos - 1)[:n_candidatos]
+
+        # Reordenar con la similitud coseno exacta
+        posiciones = bloque['posiciones'][candidatos]
+        similitudes = np.asarray(self.vectores[posiciones]) @ np.asarray(self.vectores[posicion])
+        orden = np.argsort(-similitudes, kind='stable')[:k]
+        return posiciones[orden], similitudes[orden]
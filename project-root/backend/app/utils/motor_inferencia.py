@@ -0,0 +1,145 @@
+import json
+import numpy as np
+
+# Versión del formato del artefacto compilado
+VERSION_ARTEFACTO = 1
+
+# Filas evaluadas por bloque para acotar el tamaño de la matriz de kernel
+TAMANO_BLOQUE = 256
+
+
+class MotorSVC:
+    """
+    Motor de inferencia en NumPy para el clasificador SVC de recetas
+
+    Evalúa la función de decisión RBF directamente a partir de un artefacto
+    compilado (ver app/models/exportar_modelo.py), sin depender de pandas ni
+    de scikit-learn. Replica el preprocesamiento del ColumnTransformer
+    (StandardScaler + OneHotEncoder) y la votación uno contra uno de libsvm.
+    """
+
+    def __init__(self, artefacto: dict):
+        metadatos = json.loads(str(artefacto['metadatos']))
+        if metadatos.get('version') != VERSION_ARTEFACTO:
+            raise ValueError(f"Versión de artefacto no soportada: {metadatos.get('version')}")
+
+        self.metadatos = metadatos
+        self.columnas_numericas = metadatos['columnas_numericas']
+        self.categorias = metadatos['categorias']
+        self.n_columnas = metadatos['n_columnas']
+        self.inicio_numericas = metadatos['inicio_numericas']
+
+        self.media = np.asarray(artefacto['media'], dtype=np.float64)
+        self.escala = np.asarray(artefacto['escala'], dtype=np.float64)
+        self.vectores_soporte = np.asarray(artefacto['vectores_soporte'], dtype=np.float64)
+        self.coef_dual = np.asarray(artefacto['coef_dual'], dtype=np.float64)
+        self.intercepto = np.asarray(artefacto['intercepto'], dtype=np.float64)
+        self.n_soporte = np.asarray(artefacto['n_soporte'], dtype=np.int64)
+        self.classes_ = np.asarray(artefacto['clases'])
+        self.gamma = float(artefacto['gamma'])
+
+        # Normas de los vectores de soporte para la distancia euclídea
+        self.normas_soporte = np.einsum('ij,ij->i', self.vectores_soporte, self.vectores_soporte)
+        self.coef_pares = self._coeficientes_pares()
+
+    def _coeficientes_pares(self) -> np.ndarray:
+        """
+        Coeficientes de cada par de clases sobre todos los vectores de soporte
+
+        Sigue el orden de pares de libsvm (0-1, 0-2, ..., 1-2, ...). Los vectores
+        de soporte de las clases que no forman parte del par quedan en cero.
+
+        Returns:
+            np.ndarray de forma (n_pares, n_vectores_soporte)
+        """
+        n_clases = len(self.classes_)
+        if n_clases == 2:
+            return self.coef_dual[:1].copy()
+
+        limites = np.concatenate([[0], np.cumsum(self.n_soporte)])
+        coeficientes = np.zeros((len(self.intercepto), self.vectores_soporte.shape[0]), dtype=np.float64)
+        par = 0
+        for i in range(n_clases):
+            for j in range(i + 1, n_clases):
+                coeficientes[par, limites[i]:limites[i + 1]] = self.coef_dual[j - 1, limites[i]:limites[i + 1]]
+                coeficientes[par, limites[j]:limites[j + 1]] = self.coef_dual[i, limites[j]:limites[j + 1]]
+                par += 1
+        return coeficientes
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'MotorSVC':
+        """Cargar un artefacto compilado desde un archivo .npz"""
+        with np.load(ruta, allow_pickle=False) as artefacto:
+            return cls({clave: artefacto[clave] for clave in artefacto.files})
+
+    def transformar(self, filas: list) -> np.ndarray:
+        """
+        Convertir filas crudas en la matriz de características del modelo
+
+        Args:
+            filas (list): Lista de diccionarios con las columnas originales
+
+        Returns:
+            np.ndarray de forma (n_filas, n_columnas)
+        """
+        X = np.zeros((len(filas), self.n_columnas), dtype=np.float64)
+        fin_numericas = self.inicio_numericas + len(self.columnas_numericas)
+
+        numericas = np.array(
+            [[fila[columna] for columna in self.columnas_numericas] for fila in filas],
+            dtype=np.float64
+        ).reshape(len(filas), len(self.columnas_numericas))
+        X[:, self.inicio_numericas:fin_numericas] = (numericas - self.media) / self.escala
+
+        # Las categorías desconocidas o eliminadas por drop se quedan en cero
+        for columna, posiciones in self.categorias.items():
+            for i, fila in enumerate(filas):
+                posicion = posiciones.get(str(fila[columna]))
+                if posicion is not None:
+                    X[i, posicion] = 1.0
+        return X
+
+    def decision(self, X: np.ndarray) -> np.ndarray:
+        """
+        Valores de decisión uno contra uno para cada par de clases
+
+        Returns:
+            np.ndarray de forma (n_filas, n_pares)
+        """
+        normas = np.einsum('ij,ij->i', X, X)
+        distancias = normas[:, None] + self.normas_soporte[None, :] - 2.0 * (X @ self.vectores_soporte.T)
+        kernel = np.exp(-self.gamma * np.maximum(distancias, 0.0))
+
+        decisiones = kernel @ self.coef_pares.T + self.intercepto
+        return decisiones[:, 0] if len(self.classes_) == 2 else decisiones
+
+    def indices_clase(self, decisiones: np.ndarray) -> np.ndarray:
+        """Convertir valores de decisión en índices de clase con la votación de libsvm"""
+        n_clases = len(self.classes_)
+        if n_clases == 2:
+            return (decisiones > 0).astype(np.int64)
+
+        votos = np.zeros((decisiones.shape[0], n_clases), dtype=np.int64)
+        par = 0
+        for i in range(n_clases):
+            for j in range(i + 1, n_clases):
+                gana_i = decisiones[:, par] > 0
+                votos[:, i] += gana_i
+                votos[:, j] += ~gana_i
+                par += 1
+        return np.argmax(votos, axis=1)
+
+    def etiquetas(self, decisiones: np.ndarray) -> np.ndarray:
+        """Convertir valores de decisión en etiquetas"""
+        return self.classes_[self.indices_clase(decisiones)]
+
+    def predict(self, filas: list) -> np.ndarray:
+        """Predecir la etiqueta de recomendación para una lista de filas crudas"""
+        bloques = [
+            self._predecir_bloque(filas[inicio:inicio + TAMANO_BLOQUE])
+            for inicio in range(0, len(filas), TAMANO_BLOQUE)
+        ]
+        return np.concatenate(bloques) if bloques else self.classes_[:0]
+
+    def _predecir_bloque(self, filas: list) -> np.ndarray:
+        return self.etiquetas(self.decision(self.transformar(filas)))
@@ -0,0 +1,66 @@
+from typing import Dict
+
+# Multiplicadores de nivel de actividad
+MULTIPLICADORES_ACTIVIDAD = {
+    'sedentario': 1.2,
+    'ligero': 1.375,
+    'moderado': 1.55,
+    'activo': 1.725,
+    'muy_activo': 1.9
+}
+
+# Nivel de actividad usado cuando no se indica o no se reconoce
+NIVEL_ACTIVIDAD_POR_DEFECTO = 'moderado'
+
+GENEROS = ('hombre', 'mujer')
+
+
+def calcular_tmb(peso: float, altura: float, edad: int, genero: str) -> float:
+    """
+    Tasa Metabólica Basal (TMB) usando la Ecuación de Mifflin-St Jeor
+
+    Args:
+        peso (float): Peso del usuario en kg
+        altura (float): Altura del usuario en cm
+        edad (int): Edad del usuario en años
+        genero (str): Género del usuario ('hombre' o 'mujer')
+    """
+    if genero.lower() == 'hombre':
+        return 10 * peso + 6.25 * altura - 5 * edad + 5
+    return 10 * peso + 6.25 * altura - 5 * edad - 161
+
+
+def calcular_tdee(peso: float, altura: float, edad: int, genero: str, nivel_actividad: str) -> float:
+    """Gasto Energético Diario Total (TDEE) en kcal"""
+    multiplicador = MULTIPLICADORES_ACTIVIDAD.get(
+        nivel_actividad.lower(), MULTIPLICADORES_ACTIVIDAD[NIVEL_ACTIVIDAD_POR_DEFECTO]
+    )
+    return calcular_tmb(peso, altura, edad, genero) * multiplicador
+
+
+def calcular_necesidades_nutricionales(peso: float, altura: float, edad: int, genero: str, nivel_actividad: str) -> Dict[str, float]:
+    """
+    Calcular requerimientos nutricionales diarios basados en el perfil del usuario
+
+    Args:
+        peso (float): Peso del usuario en kg
+        altura (float): Altura del usuario en cm
+        edad (int): Edad del usuario en años
+        genero (str): Género del usuario ('hombre' o 'mujer')
+        nivel_actividad (str): Nivel de actividad del usuario ('sedentario', 'ligero', 'moderado', 'activo', 'muy_activo')
+
+    Returns:
+        Diccionario con valores nutricionales diarios recomendados
+    """
+    tdee = calcular_tdee(peso, altura, edad, genero, nivel_actividad)
+
+    # Recomendaciones nutricionales
+    return {
+        'calorias': tdee,
+        'proteina': peso * 1.6,  # Recomendación de proteína: 1.6g por kg de peso corporal
+        'carbohidratos': (tdee * 0.45) / 4,  # 45% de calorías de carbohidratos
+        'grasa_total': (tdee * 0.25) / 9,  # 25% de calorías de grasa
+        'azucar': (tdee * 0.1) / 4,  # Limitar azúcar al 10% de calorías totales
+        'sodio': 2300,  # Ingesta diaria de sodio recomendada
+        'grasa_saturada': (tdee * 0.07) / 9  # Limitar grasa saturada al 7% de calorías
+    }
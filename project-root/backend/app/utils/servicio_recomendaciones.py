@@ -0,0 +1,352 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from datetime import datetime
+
+import joblib
+import pandas as pd
+
+from .cache_predicciones import CachePredicciones, clave_perfil
+from .catalogo import CatalogoRecetas, TIPOS_COMIDA
+from .catalogo_columnar import cargar_catalogo_columnar, ARCHIVO_ESQUEMA
+from .ejecutor_inferencia import EjecutorInferencia
+from .motor_inferencia import MotorSVC
+from .tabla_etiquetas import TablaEtiquetas
+
+# Perfil usado para la predicción de calentamiento
+PERFIL_CALENTAMIENTO = {
+    "Edad": 30,
+    "Peso (kg)": 70.0,
+    "Altura (cm)": 170.0,
+    "Restricciones Dietéticas": "Ninguna",
+    "Preferencia": "Salado"
+}
+
+# Límites de la caché de predicciones
+CACHE_MAX_ENTRADAS = 10000
+CACHE_TTL_SEGUNDOS = 3600
+
+# Cada cuántos segundos se comprueba si el artefacto del modelo cambió en disco
+INTERVALO_VERIFICACION_MODELO = 5.0
+
+# Espera antes de reintentar un calentamiento fallido; se duplica tras cada fallo hasta el máximo
+ESPERA_REINTENTO_INICIAL = 5.0
+ESPERA_REINTENTO_MAXIMA = 300.0
+
+
+def firma_archivo(ruta: str) -> tuple:
+    """Fecha de modificación y tamaño, usados para detectar cambios sin leer el archivo"""
+    estado = os.stat(ruta)
+    return estado.st_mtime_ns, estado.st_size
+
+
+def version_artefacto(ruta: str) -> dict:
+    """
+    Describir la versión de un artefacto en disco
+
+    Para directorios (catálogo columnar) se usa el archivo de esquema.
+
+    Returns:
+        Diccionario con fecha de modificación, tamaño y hash SHA-256 abreviado
+    """
+    archivo = os.path.join(ruta, ARCHIVO_ESQUEMA) if os.path.isdir(ruta) else ruta
+    sha = hashlib.sha256()
+    with open(archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            sha.update(bloque)
+    estado = os.stat(archivo)
+    return {
+        'modificado': datetime.fromtimestamp(estado.st_mtime).isoformat(),
+        'tamano': estado.st_size,
+        'sha256': sha.hexdigest()[:12]
+    }
+
+
+def cargar_modelo(ruta: str, tipo: str):
+    """Cargar un artefacto de modelo: 'tabla', 'compilado' o 'joblib'"""
+    if tipo == 'tabla':
+        return TablaEtiquetas.cargar(ruta)
+    if tipo == 'compilado':
+        return MotorSVC.cargar(ruta)
+    return joblib.load(ruta)
+
+
+def predecir_con_modelo(modelo, filas: list):
+    """Predecir con la tabla, el motor compilado o el pipeline de sklearn"""
+    if isinstance(modelo, (MotorSVC, TablaEtiquetas)):
+        return modelo.predict(filas)
+    return modelo.predict(pd.DataFrame(filas))
+
+
+class ServicioRecomendaciones:
+    """
+    Contenedor de los recursos del servicio de recomendaciones
+
+    Carga el modelo y el catálogo de forma perezosa (en la primera petición) o
+    de forma explícita con calentar(), que además ejecuta una predicción de
+    prueba. El estado de preparación se expone en /health para que el tráfico
+    solo llegue cuando el modelo ya está caliente.
+
+    Con modo_inferencia='tabla' las etiquetas se leen de la tabla cuantizada
+    precalculada (ver app/models/generar_tabla_etiquetas.py) en lugar de
+    evaluar el modelo. En ese modo la tabla es obligatoria: si falta, la carga
+    falla y /health indica que el servicio no está listo, en lugar de usar el
+    modelo sin avisar.
+
+    Con procesos_inferencia > 0 las predicciones se ejecutan en un pool de
+    procesos (ver ejecutor_inferencia.py) para no retener el GIL del proceso
+    de Flask; con 0 se predice en el mismo hilo de la petición.
+    """
+
+    def __init__(self, ruta_modelo: str, ruta_modelo_compilado: str, ruta_dataset: str, ruta_catalogo: str,
+                 ruta_tabla: str = None, modo_inferencia: str = 'exacto', procesos_inferencia: int = 0,
+                 max_pendientes_inferencia: int = 32, timeout_inferencia: float = 5.0):
+        if modo_inferencia not in ('exacto', 'tabla'):
+            raise ValueError(f"Modo de inferencia no soportado: {modo_inferencia}")
+        if modo_inferencia == 'tabla' and not ruta_tabla:
+            raise ValueError("El modo de inferencia 'tabla' necesita ruta_tabla")
+
+        self.ruta_modelo = ruta_modelo
+        self.ruta_modelo_compilado = ruta_modelo_compilado
+        self.ruta_dataset = ruta_dataset
+        self.ruta_catalogo = ruta_catalogo
+        self.ruta_tabla = ruta_tabla
+        self.modo_inferencia = modo_inferencia
+
+        self.modelo = None
+        self.tipo_modelo = None
+        self.catalogo = None
+        self.listo = False
+        self.error = None
+        self.versiones = {}
+        self.tiempos = {}
+        self.cache = CachePredicciones(CACHE_MAX_ENTRADAS, CACHE_TTL_SEGUNDOS)
+        self._firma_modelo = None
+        self._ultima_verificacion = 0.0
+        self._lock = threading.Lock()
+        self._lock_reintento = threading.Lock()
+        self._hilo_calentamiento = None
+        self._espera_reintento = ESPERA_REINTENTO_INICIAL
+        self._proximo_reintento = 0.0
+
+        # Los procesos hijos que vuelven a importar la app no crean su propio pool
+        self.ejecutor = None
+        if procesos_inferencia > 0 and multiprocessing.current_process().name == 'MainProcess':
+            self.ejecutor = EjecutorInferencia(
+                cargar_modelo, predecir_con_modelo,
+                procesos_inferencia, max_pendientes_inferencia, timeout_inferencia
+            )
+
+    def _ruta_modelo_activo(self) -> str:
+        """
+        Artefacto del modelo que se usa: la tabla en modo 'tabla', si no el
+        modelo compilado si existe y en último caso el pipeline de joblib
+
+        Raises:
+            FileNotFoundError: Si el modo es 'tabla' y la tabla no existe
+        """
+        if self.modo_inferencia == 'tabla':
+            if not os.path.exists(self.ruta_tabla):
+                raise FileNotFoundError(f"No existe la tabla de etiquetas del modo 'tabla': {self.ruta_tabla}")
+            return self.ruta_tabla
+        if os.path.exists(self.ruta_modelo_compilado):
+            return self.ruta_modelo_compilado
+        return self.ruta_modelo
+
+    def _tipo_modelo(self, ruta: str) -> str:
+        if ruta == self.ruta_tabla:
+            return 'tabla'
+        if ruta == self.ruta_modelo_compilado:
+            return 'compilado'
+        return 'joblib'
+
+    def _cargar_modelo(self):
+        """Cargar el modelo activo y vaciar la caché si su versión cambió"""
+        inicio = time.perf_counter()
+        ruta = self._ruta_modelo_activo()
+        firma = firma_archivo(ruta)
+        tipo = self._tipo_modelo(ruta)
+        modelo = cargar_modelo(ruta, tipo)
+        version = version_artefacto(ruta)
+        self.tiempos['carga_modelo'] = time.perf_counter() - inicio
+
+        self.modelo = modelo
+        self.tipo_modelo = tipo
+        self.versiones['modelo'] = version
+        self._firma_modelo = (ruta, firma)
+        self.cache.asegurar_version(version['sha256'])
+
+        # Los workers recargan el modelo en su siguiente predicción
+        if self.ejecutor is not None:
+            self.ejecutor.iniciar((ruta, tipo, firma))
+
+    def cargar(self):
+        """
+        Cargar modelo y catálogo si aún no están cargados
+
+        Se prefiere el motor compilado en NumPy y el catálogo columnar; si no
+        existen se usan el pipeline de sklearn y el CSV.
+
+        Raises:
+            Exception: Si no se puede cargar alguno de los recursos
+        """
+        if self.modelo is not None and self.catalogo is not None:
+            return
+
+        with self._lock:
+            if self.modelo is not None and self.catalogo is not None:
+                return
+
+            try:
+                if self.modelo is None:
+                    self._cargar_modelo()
+
+                inicio = time.perf_counter()
+                if os.path.isdir(self.ruta_catalogo):
+                    catalogo = cargar_catalogo_columnar(self.ruta_catalogo)
+                    self.versiones['catalogo'] = version_artefacto(self.ruta_catalogo)
+                else:
+                    catalogo = CatalogoRecetas.desde_dataframe(pd.read_csv(self.ruta_dataset))
+                    self.versiones['catalogo'] = version_artefacto(self.ruta_dataset)
+                self.tiempos['carga_catalogo'] = time.perf_counter() - inicio
+            except Exception as e:
+                self.error = str(e)
+                print(f"Error al cargar modelo o dataset: {e}")
+                raise
+
+            self.catalogo = catalogo
+            self.error = None
+
+    def verificar_modelo(self):
+        """
+        Recargar el modelo si su artefacto cambió en disco
+
+        La comprobación se limita a una cada INTERVALO_VERIFICACION_MODELO
+        segundos; al recargar, la caché de predicciones se vacía.
+        """
+        ahora = time.monotonic()
+        if ahora - self._ultima_verificacion < INTERVALO_VERIFICACION_MODELO:
+            return
+        self._ultima_verificacion = ahora
+
+        try:
+            ruta = self._ruta_modelo_activo()
+            cambio = self._firma_modelo != (ruta, firma_archivo(ruta))
+        except OSError:
+            return
+        if cambio:
+            with self._lock:
+                try:
+                    self._cargar_modelo()
+                except Exception as e:
+                    # Se sigue sirviendo con el modelo anterior
+                    print(f"Error al recargar el modelo: {e}")
+
+    def calentar(self) -> bool:
+        """
+        Cargar los recursos y ejecutar una predicción de prueba
+
+        Returns:
+            True si el servicio quedó listo para recibir tráfico
+        """
+        try:
+            self.cargar()
+            inicio = time.perf_counter()
+            # Se usa el modelo directamente para no dejar el perfil de prueba en la caché
+            etiquetas = self._predecir_modelo([
+                dict(PERFIL_CALENTAMIENTO, **{"Tipo de Comida": tipo_comida}) for tipo_comida in TIPOS_COMIDA
+            ])
+            for tipo_comida, etiqueta in zip(TIPOS_COMIDA, etiquetas):
+                self.catalogo.candidatos(etiqueta, tipo_comida)
+            self.tiempos['calentamiento'] = time.perf_counter() - inicio
+        except Exception as e:
+            self.error = str(e)
+            self.listo = False
+            self._proximo_reintento = time.monotonic() + self._espera_reintento
+            self._espera_reintento = min(self._espera_reintento * 2, ESPERA_REINTENTO_MAXIMA)
+            print(f"Error al calentar el servicio: {e}")
+            return False
+
+        self.listo = True
+        self._espera_reintento = ESPERA_REINTENTO_INICIAL
+        return True
+
+    def reintentar_calentamiento(self) -> bool:
+        """
+        Reintentar calentar() en segundo plano si el servicio no está listo
+
+        Solo hay un reintento en curso a la vez y, tras cada fallo, el siguiente
+        espera el doble (hasta ESPERA_REINTENTO_MAXIMA), así que consultar
+        /health con frecuencia no vuelve a cargar el catálogo en cada petición.
+
+        Returns:
+            True si se inició un reintento
+        """
+        if self.listo:
+            return False
+        with self._lock_reintento:
+            en_curso = self._hilo_calentamiento is not None and self._hilo_calentamiento.is_alive()
+            if en_curso or time.monotonic() < self._proximo_reintento:
+                return False
+            self._hilo_calentamiento = threading.Thread(target=self.calentar, name='calentamiento', daemon=True)
+            self._hilo_calentamiento.start()
+        return True
+
+    def recursos(self) -> tuple:
+        """Modelo y catálogo listos para usar, cargándolos si hace falta"""
+        self.cargar()
+        return self.modelo, self.catalogo
+
+    def predecir_etiquetas(self, filas: list) -> list:
+        """
+        Predecir etiquetas para filas crudas, usando la caché de predicciones
+
+        Solo las filas que no están en la caché pasan por el modelo, todas en
+        una misma llamada.
+        """
+        self.recursos()
+        self.verificar_modelo()
+
+        claves = [clave_perfil(fila) for fila in filas]
+        etiquetas = [self.cache.obtener(clave) for clave in claves]
+        pendientes = [i for i, etiqueta in enumerate(etiquetas) if etiqueta is None]
+
+        if pendientes:
+            predichas = self._predecir_modelo([filas[i] for i in pendientes])
+            for i, etiqueta in zip(pendientes, predichas):
+                etiquetas[i] = etiqueta
+                self.cache.guardar(claves[i], etiqueta)
+        return etiquetas
+
+    def _predecir_modelo(self, filas: list):
+        """
+        Predecir en el pool de procesos si está configurado, si no en este hilo
+
+        Raises:
+            ServicioSaturado: Si el pool no puede atender la predicción a tiempo
+        """
+        if self.ejecutor is not None:
+            return self.ejecutor.predecir(filas)
+        return predecir_con_modelo(self.modelo, filas)
+
+    def estado(self) -> dict:
+        """
+        Resumen del estado del servicio para el endpoint /health
+
+        Es una respuesta pública: no incluye rutas del servidor ni el texto de
+        los errores, que solo se imprimen en el log.
+        """
+        return {
+            'listo': self.listo,
+            'modelo': type(self.modelo).__name__ if self.modelo is not None else None,
+            'tipo_modelo': self.tipo_modelo,
+            'modo_inferencia': self.modo_inferencia,
+            'concordancia_tabla': getattr(self.modelo, 'concordancia', None),
+            'recetas': len(self.catalogo) if self.catalogo is not None else 0,
+            'versiones': self.versiones,
+            'tiempos_ms': {nombre: round(segundos * 1000, 2) for nombre, segundos in self.tiempos.items()},
+            'cache': self.cache.estadisticas(),
+            'inferencia': self.ejecutor.estadisticas() if self.ejecutor is not None else {'procesos': 0}
+        }
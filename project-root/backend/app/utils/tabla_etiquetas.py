@@ -0,0 +1,59 @@
+import json
+import numpy as np
+
+# Versión del formato de la tabla de etiquetas
+VERSION_TABLA = 1
+
+
+class TablaEtiquetas:
+    """
+    Tabla densa perfil → etiqueta precalculada sobre una rejilla cuantizada
+
+    Cada característica numérica se divide en intervalos de ancho fijo y cada
+    columna categórica tiene una posición por categoría conocida más una para
+    valores desconocidos. La predicción se reduce a indexar un arreglo, sin
+    evaluar el modelo (ver app/models/generar_tabla_etiquetas.py).
+    """
+
+    def __init__(self, tabla: np.ndarray, clases: np.ndarray, metadatos: dict):
+        if metadatos.get('version') != VERSION_TABLA:
+            raise ValueError(f"Versión de tabla no soportada: {metadatos.get('version')}")
+
+        self.tabla = tabla
+        self.classes_ = clases
+        self.metadatos = metadatos
+        self.columnas_numericas = metadatos['columnas_numericas']
+        self.minimos = np.array([metadatos['dominios'][c][0] for c in self.columnas_numericas], dtype=np.float64)
+        self.anchos = np.array([metadatos['anchos'][c] for c in self.columnas_numericas], dtype=np.float64)
+        self.n_intervalos = np.array(tabla.shape[:len(self.columnas_numericas)], dtype=np.int64)
+        self.categorias = {
+            columna: {str(valor): i for i, valor in enumerate(valores)}
+            for columna, valores in metadatos['categorias']
+        }
+        self.concordancia = metadatos.get('concordancia')
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'TablaEtiquetas':
+        """Cargar la tabla desde un archivo .npz"""
+        with np.load(ruta, allow_pickle=False) as artefacto:
+            return cls(artefacto['tabla'], artefacto['clases'], json.loads(str(artefacto['metadatos'])))
+
+    def indices(self, filas: list) -> tuple:
+        """Índices de la tabla para cada fila; los valores fuera del dominio se recortan"""
+        numericas = np.array(
+            [[fila[columna] for columna in self.columnas_numericas] for fila in filas],
+            dtype=np.float64
+        ).reshape(len(filas), len(self.columnas_numericas))
+        intervalos = np.floor((numericas - self.minimos) / self.anchos).astype(np.int64)
+        intervalos = np.clip(intervalos, 0, self.n_intervalos - 1)
+
+        # La última posición de cada columna categórica es la de valores desconocidos
+        categoricas = [
+            np.array([posiciones.get(str(fila[columna]), len(posiciones)) for fila in filas], dtype=np.int64)
+            for columna, posiciones in self.categorias.items()
+        ]
+        return tuple(intervalos.T) + tuple(categoricas)
+
+    def predict(self, filas: list) -> np.ndarray:
+        """Predecir la etiqueta de recomendación indexando la tabla"""
+        return self.classes_[self.tabla[self.indices(filas)]]
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.svm import SVC
+
+from app.models.exportar_modelo import compilar_pipeline, verificar_equivalencia
+from app.utils.motor_inferencia import MotorSVC
+
+COLUMNAS_NUMERICAS = ["Edad", "Peso (kg)", "Altura (cm)", "Requerimientos Nutricionales (Calorías)"]
+COLUMNAS_CATEGORICAS = ["Tipo de Comida", "Restricciones Dietéticas", "Preferencia"]
+
+CATEGORIAS = {
+    "Tipo de Comida": ["Desayuno", "Almuerzo", "Cena"],
+    "Restricciones Dietéticas": ["Ninguna", "Vegetariano", "Sin gluten"],
+    "Preferencia": ["Dulce", "Salado"],
+}
+
+
+def _perfiles(n: int, semilla: int, desconocidas: bool = False) -> pd.DataFrame:
+    rng = np.random.default_rng(semilla)
+    datos = {
+        "Edad": rng.uniform(18, 80, n),
+        "Peso (kg)": rng.uniform(45, 120, n),
+        "Altura (cm)": rng.uniform(150, 200, n),
+        "Requerimientos Nutricionales (Calorías)": rng.uniform(1500, 3500, n),
+    }
+    for columna, valores in CATEGORIAS.items():
+        opciones = valores + ["Desconocida"] if desconocidas else valores
+        datos[columna] = rng.choice(opciones, n)
+    return pd.DataFrame(datos)
+
+
+def _pipeline(etiquetas: list, drop="first") -> Pipeline:
+    X = _perfiles(300, semilla=0)
+    # Etiquetas que dependen de los datos para que el SVC tenga vectores de soporte de todas las clases
+    puntuacion = X["Edad"].to_numpy() / 80 + (X["Tipo de Comida"] == "Cena").to_numpy()
+    y = np.array(etiquetas)[np.digitize(puntuacion, np.quantile(puntuacion, np.linspace(0, 1, len(etiquetas) + 1)[1:-1]))]
+
+    preprocesador = ColumnTransformer(transformers=[
+        ("num", StandardScaler(), COLUMNAS_NUMERICAS),
+        ("cat", OneHotEncoder(drop=drop, handle_unknown="ignore"), COLUMNAS_CATEGORICAS),
+    ])
+    return Pipeline(steps=[
+        ("preprocessor", preprocesador),
+        ("classifier", SVC(kernel="rbf")),
+    ]).fit(X, y)
+
+
+def _decision_ovo(pipeline: Pipeline, X: pd.DataFrame) -> np.ndarray:
+    clasificador = pipeline.steps[-1][1]
+    if len(clasificador.classes_) == 2:
+        return pipeline.decision_function(X)
+    return clasificador._decision_function(pipeline[:-1].transform(X))
+
+
+@pytest.mark.filterwarnings("ignore:Found unknown categories")
+@pytest.mark.parametrize("etiquetas", [
+    ["No recomendada", "Recomendada"],
+    ["Baja", "Media", "Alta", "Muy alta"],
+], ids=["binario", "multiclase"])
+@pytest.mark.parametrize("drop", ["first", None])
+def test_motor_equivale_al_pipeline(etiquetas, drop):
+    pipeline = _pipeline(etiquetas, drop)
+    motor = MotorSVC(compilar_pipeline(pipeline))
+    X = _perfiles(500, semilla=1, desconocidas=True)
+    filas = X.to_dict(orient="records")
+
+    np.testing.assert_array_equal(motor.predict(filas), pipeline.predict(X))
+    np.testing.assert_allclose(motor.decision(motor.transformar(filas)), _decision_ovo(pipeline, X), atol=1e-8)
+
+
+@pytest.mark.filterwarnings("ignore:Found unknown categories")
+def test_categorias_desconocidas_se_codifican_como_ceros():
+    pipeline = _pipeline(["No recomendada", "Recomendada"])
+    motor = MotorSVC(compilar_pipeline(pipeline))
+    X = _perfiles(20, semilla=2)
+    X[COLUMNAS_CATEGORICAS] = "Desconocida"
+
+    np.testing.assert_allclose(
+        motor.transformar(X.to_dict(orient="records")), pipeline[:-1].transform(X), atol=1e-12
+    )
+
+
+@pytest.mark.filterwarnings("ignore:Found unknown categories")
+def test_artefacto_npz_conserva_el_motor(tmp_path):
+    pipeline = _pipeline(["Baja", "Media", "Alta"])
+    ruta = tmp_path / "modelo.npz"
+    np.savez(ruta, **compilar_pipeline(pipeline))
+
+    motor = MotorSVC.cargar(str(ruta))
+    X = _perfiles(200, semilla=3, desconocidas=True)
+    np.testing.assert_array_equal(motor.predict(X.to_dict(orient="records")), pipeline.predict(X))
+
+
+@pytest.mark.filterwarnings("ignore:Found unknown categories")
+def test_verificar_equivalencia_detecta_diferencias():
+    pipeline = _pipeline(["No recomendada", "Recomendada"])
+    artefacto = compilar_pipeline(pipeline)
+    assert verificar_equivalencia(pipeline, MotorSVC(artefacto), n_muestras=200)["coincidencias"] == 200
+
+    artefacto["intercepto"] = artefacto["intercepto"] + 10.0
+    with pytest.raises(ValueError, match="no es equivalente"):
+        verificar_equivalencia(pipeline, MotorSVC(artefacto), n_muestras=200)
+
+
+def test_compilar_rechaza_handle_unknown_error():
+    pipeline = _pipeline(["No recomendada", "Recomendada"])
+    pipeline.steps[0][1].transformers_[1][1].handle_unknown = "error"
+    with pytest.raises(ValueError, match="handle_unknown"):
+        compilar_pipeline(pipeline)
@@ -34,6 +34,23 @@ export const getRecommendations = async (referenceTime) => {
     }
   };
 
+  // Recetas parecidas a un plato del plan, para cambiarlo por otro
+  export const getSimilarRecipes = async (plato, { k = 5, tipo, restricciones = [] } = {}) => {
+    try {
+      const params = new URLSearchParams({ plato, k });
+      if (tipo) params.append("tipo", tipo);
+      if (restricciones.length) params.append("restricciones", restricciones.join(","));
+      const response = await fetch(`${BASE_URL}/recommendations/similar?${params}`);
+      if (!response.ok) {
+        throw new Error(`Error: ${response.status}`);
+      }
+      return await response.json();
+    } catch (error) {
+      console.error("Error fetching similar recipes:", error);
+      throw error;
+    }
+  };
+
 const instance = axios.create({
     baseURL: 'http://localhost:5000', // Cambia si usas otro puerto
     headers: { 'Content-Type': 'application/json' },